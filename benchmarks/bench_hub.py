@@ -0,0 +1,161 @@
+"""Benchmark für PowerDogHub gegen den simulierten PowerDog-Server.
+
+Misst je Inventargröße Discovery-Zeit, Poll-Latenz, CPU-Zeit je Poll,
+Speicherbedarf des Hubs und die Anzahl der State-Writes (geänderte Keys).
+Der Server läuft in einem eigenen Prozess, damit seine CPU-Zeit nicht
+mitgemessen wird.
+
+Mit ``--replay`` läuft der Hub statt gegen den Simulator gegen einen
+Mitschnitt eines echten Geräts (Option „Verkehr aufzeichnen“).
+
+Benötigt eine Umgebung mit installiertem Home Assistant:
+    python benchmarks/bench_hub.py --sizes 10,100,1000,5000 --polls 20
+    python benchmarks/bench_hub.py --replay powerdog_192.168.1.10_20260101_120000.jsonl.gz --speed 0
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from powerdog_sim import PASSWORD, PowerDogSimulator, serve  # noqa: E402
+
+
+def _run_server(values, latency, failure_rate, change_ratio, port_queue):
+    """Startet den Simulator im Kindprozess und meldet den Port."""
+    server, port = serve(PowerDogSimulator(values, latency, failure_rate, change_ratio))
+    port_queue.put(port)
+    server.serve_forever()
+
+
+class _BenchHass:
+    """Minimaler Ersatz für ``hass``: der Hub braucht hier nur Tasks."""
+
+    def async_create_task(self, coro, *args, **kwargs):
+        return asyncio.get_running_loop().create_task(coro)
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def _bench_size(port, polls, interval, enabled_ratio, replay=None):
+    """Führt Discovery und ``polls`` Abfragen aus und liefert die Messwerte.
+
+    Mit ``replay`` (``(Einträge, Tempo)``) antwortet ein Mitschnitt statt des Simulators.
+    """
+    from custom_components.powerdog import PowerDogHub
+    from custom_components.powerdog.recording import PowerDogReplayClient
+
+    api = PowerDogReplayClient(*replay) if replay else None
+    hub = PowerDogHub(_BenchHass(), "127.0.0.1", port, PASSWORD, interval, api=api)
+
+    tracemalloc.start()
+    mem_before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    await hub.async_fetch_data()
+    discovery = time.perf_counter() - started
+    hub_memory = tracemalloc.get_traced_memory()[0] - mem_before
+    tracemalloc.stop()
+
+    # Ohne Home Assistant meldet keine Entität ihren Key an → Anteil der Keys direkt aktivieren
+    keys = list(hub.values)
+    for key in keys[:round(len(keys) * enabled_ratio)]:
+        hub.enable_key(key)
+
+    latencies, cpu_times, writes, failures = [], [], [], 0
+    for _ in range(polls):
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        changed = await hub.async_update_values()
+        latencies.append(time.perf_counter() - started)
+        cpu_times.append(time.process_time() - cpu_started)
+        if changed is None:
+            failures += 1
+        else:
+            writes.append(len(changed))
+
+    await hub.async_close()
+    return {
+        "entities": len(hub.values),
+        "enabled": len(hub.enabled_keys),
+        "multicall": hub.api.multicall_supported,
+        "discovery_s": discovery,
+        "poll_median_s": statistics.median(latencies),
+        "poll_p95_s": _percentile(latencies, 0.95),
+        "cpu_per_poll_s": statistics.mean(cpu_times),
+        "hub_memory_kib": hub_memory / 1024,
+        "state_writes_per_poll": statistics.mean(writes) if writes else 0,
+        "failed_polls": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000,5000", help="Anzahl linearer Werte, kommagetrennt")
+    parser.add_argument("--polls", type=int, default=20)
+    parser.add_argument("--interval", type=int, default=30, help="Poll-Intervall des Hubs (für Deadband/Snapshot)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulierte Latenz je Aufruf in Sekunden")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--change-ratio", type=float, default=0.3)
+    parser.add_argument("--enabled-ratio", type=float, default=1.0, help="Anteil aktiver Entitäten")
+    parser.add_argument("--replay", metavar="FILE", help="Mitschnitt abspielen statt Simulator")
+    parser.add_argument("--speed", type=float, default=1.0, help="Tempo der Wiedergabe (0 = ohne Wartezeit)")
+    parser.add_argument("--json", action="store_true", help="Ergebnisse als JSON ausgeben")
+    args = parser.parse_args()
+
+    if args.replay:
+        from custom_components.powerdog.recording import load_recording
+
+        replay = (load_recording(args.replay), args.speed)
+        result = asyncio.run(_bench_size(0, args.polls, args.interval, args.enabled_ratio, replay))
+        _print_results([{"values": result["entities"], **result}], args.json)
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        port_queue = ctx.Queue()
+        server = ctx.Process(
+            target=_run_server,
+            args=(size, args.latency, args.failure_rate, args.change_ratio, port_queue),
+            daemon=True,
+        )
+        server.start()
+        try:
+            port = port_queue.get(timeout=30)
+            result = asyncio.run(_bench_size(port, args.polls, args.interval, args.enabled_ratio))
+        finally:
+            server.terminate()
+            server.join()
+        results.append({"values": size, **result})
+
+    _print_results(results, args.json)
+
+
+def _print_results(results, as_json):
+    """Gibt die Messwerte als Tabelle oder JSON aus."""
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'values':>7} {'entities':>8} {'enabled':>7} {'discovery':>10} {'poll med':>9} {'poll p95':>9} "
+          f"{'cpu/poll':>9} {'hub KiB':>9} {'writes/poll':>11} {'failed':>6}")
+    for r in results:
+        print(f"{r['values']:>7} {r['entities']:>8} {r['enabled']:>7} {r['discovery_s'] * 1000:>8.1f}ms "
+              f"{r['poll_median_s'] * 1000:>7.1f}ms {r['poll_p95_s'] * 1000:>7.1f}ms "
+              f"{r['cpu_per_poll_s'] * 1000:>7.2f}ms {r['hub_memory_kib']:>9.0f} "
+              f"{r['state_writes_per_poll']:>11.1f} {r['failed_polls']:>6}")
+
+
+if __name__ == "__main__":
+    main()
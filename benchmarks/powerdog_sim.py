@@ -0,0 +1,163 @@
+"""Simulierter PowerDog XML-RPC-Server für Benchmarks.
+
+Implementiert die von der Integration genutzten Methoden (getSensors,
+getCounters, getRegulations, getLinearDevices, getAllCurrentLinearValues,
+setRegulationParameter) sowie system.multicall, mit einstellbarer
+Geräteanzahl, Latenz und Fehlerrate.
+
+Standalone starten:
+    python benchmarks/powerdog_sim.py --values 500 --latency 0.05
+"""
+import argparse
+import random
+import socketserver
+import threading
+import time
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+PASSWORD = "powerdog"
+
+# Aufteilung der linearen Werte auf die Gerätearten
+SHARE_SENSORS = 0.4
+SHARE_COUNTERS = 0.2
+SHARE_REGULATIONS = 0.2
+
+
+class _KeepAliveHandler(SimpleXMLRPCRequestHandler):
+    """HTTP/1.1, damit der Client Verbindungen wiederverwenden kann."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002 - Signatur der Basisklasse
+        pass
+
+
+class _ThreadingXMLRPCServer(socketserver.ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+
+
+class PowerDogSimulator:
+    """Hält das simulierte Inventar und beantwortet die API-Aufrufe."""
+
+    def __init__(self, values: int = 100, latency: float = 0.0, failure_rate: float = 0.0,
+                 change_ratio: float = 0.3, seed: int = 0):
+        """Erzeugt ein Inventar mit ``values`` linearen Werten."""
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.change_ratio = change_ratio
+        self.random = random.Random(seed)
+        self.calls = {}
+        self._lock = threading.Lock()
+
+        self.sensors = {}
+        self.counters = {}
+        self.regulations = {}
+        self.linear_devices = {}
+        self.current = {}
+
+        n_sensors = int(values * SHARE_SENSORS)
+        n_counters = int(values * SHARE_COUNTERS)
+        n_regulations = int(values * SHARE_REGULATIONS)
+        n_linear = values - n_sensors - n_counters - n_regulations
+
+        for i in range(n_sensors):
+            self._add(self.sensors, f"sensor_{i}", {"Name": f"Sensor {i}", "Unit": "W"}, 100.0 + i)
+        for i in range(n_counters):
+            self._add(self.counters, f"counter_{i}", {
+                "Name": f"Zähler {i}", "Unit": "W", "Unit_Time_Add": "h", "LinearType": "counter",
+                "30Day_Usage": 0.0, "Today_Usage": 0.0, "Year_Usage": 0.0,
+            }, 1000.0 * i)
+        for i in range(n_regulations):
+            setable = "onoff(bool)" if i % 2 else "manual(bool),value(double)"
+            self._add(self.regulations, f"regulation_{i}", {
+                "Name": f"Regelung {i}", "Setable": setable, "SwitchMode": "1", "SwitchState": "0",
+                "OnOff": "0", "Min": 0, "Max": 100,
+            }, 0.0)
+        for i in range(n_linear):
+            self._add(self.linear_devices, f"linear_{i}", {"Name": f"Gerät {i}", "Unit": "W"}, 50.0)
+
+    def _add(self, group, key, info, value):
+        group[key] = {"Key": key, "Current_Value": value, **info}
+        self.current[key] = value
+
+    def _enter(self, method, password):
+        """Gemeinsame Vorarbeit aller Methoden: Latenz, Fehler, Passwort, Zählung."""
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            raise RuntimeError(f"Simulierter Fehler in {method}")
+        return password == PASSWORD
+
+    @staticmethod
+    def _reply(ok, reply):
+        return {"ErrorCode": 0, "Reply": reply} if ok else {"ErrorCode": 1, "Reply": {}}
+
+    def getSensors(self, password):  # noqa: N802 - PowerDog API-Name
+        return self._reply(self._enter("getSensors", password), self.sensors)
+
+    def getCounters(self, password):  # noqa: N802
+        return self._reply(self._enter("getCounters", password), self.counters)
+
+    def getRegulations(self, password):  # noqa: N802
+        return self._reply(self._enter("getRegulations", password), self.regulations)
+
+    def getLinearDevices(self, password):  # noqa: N802
+        return self._reply(self._enter("getLinearDevices", password), self.linear_devices)
+
+    def getAllCurrentLinearValues(self, password):  # noqa: N802
+        ok = self._enter("getAllCurrentLinearValues", password)
+        reply = {}
+        for key, value in self.current.items():
+            if self.random.random() < self.change_ratio:
+                value = round(value + self.random.uniform(-5, 5), 2)
+                self.current[key] = value
+            entry = {"Current_Value": value, "Key": key, "Unit": "W", "Timestamp": int(time.time())}
+            if key in self.counters:
+                entry.update({"30Day_Usage": value * 30, "Today_Usage": value, "Year_Usage": value * 365})
+            reply[key] = entry
+        return self._reply(ok, reply)
+
+    def setRegulationParameter(self, password, key, parameter, value):  # noqa: N802
+        ok = self._enter("setRegulationParameter", password) and key in self.regulations
+        if ok:
+            # Wie das Gerät: Modus und Status der Regelung folgen dem Befehl (für getRegulations)
+            regulation = self.regulations[key]
+            state = str(int(float(value)))
+            if parameter == "manual":
+                regulation["SwitchMode"] = state
+            elif parameter in ("value", "onoff"):
+                regulation["SwitchState" if parameter == "value" else "OnOff"] = state
+                self.current[key] = float(value)
+                regulation["Current_Value"] = float(value)
+        return self._reply(ok, {})
+
+
+def serve(simulator: PowerDogSimulator, host: str = "127.0.0.1", port: int = 0):
+    """Startet den Server und gibt ``(server, port)`` zurück (Aufrufer ruft serve_forever)."""
+    server = _ThreadingXMLRPCServer((host, port), requestHandler=_KeepAliveHandler,
+                                    allow_none=True, logRequests=False)
+    server.register_instance(simulator)
+    server.register_multicall_functions()
+    return server, server.server_address[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=20000)
+    parser.add_argument("--values", type=int, default=100, help="Anzahl linearer Werte")
+    parser.add_argument("--latency", type=float, default=0.0, help="Sekunden je Aufruf")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Anteil fehlschlagender Aufrufe")
+    parser.add_argument("--change-ratio", type=float, default=0.3, help="Anteil geänderter Werte je Poll")
+    args = parser.parse_args()
+
+    simulator = PowerDogSimulator(args.values, args.latency, args.failure_rate, args.change_ratio)
+    server, port = serve(simulator, args.host, args.port)
+    print(f"PowerDog-Simulator auf {args.host}:{port} (Passwort: {PASSWORD})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,67 @@
 import asyncio
 import logging
-import xmlrpc.client
+import time
+from datetime import timedelta
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.typing import ConfigType
-from .const import DOMAIN  # Hier wird DOMAIN aus const.py importiert
+from homeassistant.util import dt as dt_util
+from .api import PowerDogApiClient, PowerDogApiError, PowerDogCircuitOpenError
+from .cache import PowerDogDiscoveryCache
+from .commands import PowerDogCommandQueue
+from .coordinator import PowerDogCoordinator
+from .deadband import DeadbandFilter
+from .derived import PowerDogDerived
+from .entity import migrate_unique_id, unique_id_for
+from .model import PowerDogValue, UNPUBLISHED, USAGE_TYPES, usage_key
+from .parser import LinearValuesParser
+from .recording import PowerDogRecorder
+from .scheduler import PowerDogPollScheduler
+from .services import async_setup_services
+from .sampling import PowerDogSampler
+from .tiers import PollTiers
+from .const import (  # Hier wird DOMAIN aus const.py importiert
+    DOMAIN,
+    CONF_HOST,
+    CONF_PORT,
+    CONF_PASSWORD,
+    CONF_INTERVAL,
+    CONF_ADAPTIVE_POLLING,
+    CONF_FAST_SAMPLING_INTERVAL,
+    CONF_RECORD_TRAFFIC,
+    CONF_IMPORT_STATISTICS,
+    CONF_DERIVED_SENSORS,
+    CONF_NUMBER_SETTLE_TIME,
+    DEFAULT_NUMBER_SETTLE_TIME,
+    REDISCOVERY_INTERVAL,
+    SIGNAL_NEW_ENTITIES,
+    SNAPSHOT_MAX_AGE_INTERVALS,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# API-Methoden, die zusammen das Geräteinventar liefern
+DISCOVERY_METHODS = ("getSensors", "getCounters", "getRegulations", "getLinearDevices")
+
+# Wartezeit nach einem Schreibbefehl bis zur Rückmeldung über getRegulations (Sekunden);
+# gibt dem Gerät Zeit, den Befehl umzusetzen, und fasst gleichzeitige Rückmeldungen zusammen
+READ_BACK_DELAY = 0.25
+
+# Plattformen mit einer Entität je Key
+ENTITY_PLATFORMS = ("sensor", "switch", "select", "number")
+
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Setze die Konfigurationsdatei ein (configuration.yaml)."""
     _LOGGER.debug("🔄 async_setup() in __init__.py wurde aufgerufen!")
     hass.data.setdefault(DOMAIN, {})
+    async_setup_services(hass)
     return True
 
 
@@ -21,72 +69,481 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Setze die Konfiguration über die UI ein."""
     _LOGGER.debug("🚀 async_setup_entry() wurde aufgerufen! Registriere Plattformen...")
 
+    # Im Options-Flow geänderte Verbindungsdaten überschreiben die der Ersteinrichtung
+    config = {**entry.data, **entry.options}
     hub = PowerDogHub(
         hass,
-        entry.data["host"],
-        entry.data.get("port", 20000),
-        entry.data["password"],
-        entry.data.get("interval", 30)
+        config[CONF_HOST],
+        config.get(CONF_PORT, 20000),
+        config[CONF_PASSWORD],
+        config.get(CONF_INTERVAL, 30),
+        deadband=DeadbandFilter.from_options(entry.options),
+        fast_sampling=_fast_sampling(entry),
+        settle_time=_settle_time(entry),
+        tiers=PollTiers.from_options(entry.options),
+        derived=PowerDogDerived.from_options(entry.options),
+    )
+    if hub.sampler is not None:
+        hub.sampler.resize(hub.interval, entry.options.get(CONF_ADAPTIVE_POLLING, False))
+
+    if entry.options.get(CONF_RECORD_TRAFFIC, False):
+        path = hass.config.path(f"{DOMAIN}_{hub.host}_{dt_util.utcnow():%Y%m%d_%H%M%S}.jsonl.gz")
+        hub.api.recorder = PowerDogRecorder(path, hub.password)
+        _LOGGER.info(f"🎙️ PowerDog Verkehr wird aufgezeichnet nach {path}")
+
+    # Inventar aus dem Cache laden, damit der Start nicht auf das Gerät warten muss
+    cache = PowerDogDiscoveryCache(hass, entry.entry_id)
+    inventory = await cache.async_load()
+    if inventory:
+        _LOGGER.debug(f"💾 PowerDog Inventar aus dem Cache geladen: {len(inventory)} Einträge")
+        hub.load_inventory(inventory)
+        hub.track_task(entry.async_create_background_task(
+            hass, _async_rediscover(hass, entry, hub, cache), f"{DOMAIN}_discovery"
+        ))
+    else:
+        inventory = await hub.async_fetch_data()
+        if not inventory:
+            raise ConfigEntryNotReady(f"PowerDog unter {hub.host}:{hub.port} nicht erreichbar")
+        await cache.async_save(inventory)
+
+    # Der Coordinator übernimmt das periodische Update und benachrichtigt die Entitäten
+    coordinator = PowerDogCoordinator(hass, hub)
+    hass.data[DOMAIN][entry.entry_id] = {"hub": hub, "coordinator": coordinator}
+
+    if entry.options.get(CONF_IMPORT_STATISTICS, False):
+        if "recorder" in hass.config.components:
+            # Erst hier importieren: lädt den Recorder-Stack, den sonst niemand braucht
+            from .energy import PowerDogEnergyStatistics
+
+            # Counter-Stände stündlich gesammelt als Langzeitstatistik, Lücken werden aufgefüllt
+            hub.energy = PowerDogEnergyStatistics(hass, entry.entry_id, hub)
+            entry.async_on_unload(hub.energy.async_start())
+        else:
+            _LOGGER.warning("⚠️ PowerDog Statistik-Import benötigt den Recorder, ist aber nicht geladen")
+
+    @callback
+    def async_scheduled_rediscovery(_now):
+        """Gleicht das Inventar regelmäßig mit dem Gerät ab (wird beim Entladen abgebrochen)."""
+        hub.track_task(entry.async_create_background_task(
+            hass, _async_rediscover(hass, entry, hub, cache), f"{DOMAIN}_discovery"
+        ))
+
+    entry.async_on_unload(
+        async_track_time_interval(hass, async_scheduled_rediscovery, timedelta(seconds=REDISCOVERY_INTERVAL))
     )
 
-    await hub.async_fetch_data()
-    hass.data[DOMAIN]["hub"] = hub
+    async def async_close_hub(event):
+        """Schließt den Verbindungspool beim Beenden von Home Assistant."""
+        await hub.async_close()
 
-    # Starte das periodische Update
-    hass.loop.create_task(hub.async_update_loop())
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_close_hub))
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
-    await hass.config_entries.async_forward_entry_setups(entry, ["sensor", "switch", "select", "number"])
+    await hass.config_entries.async_forward_entry_setups(entry, ENTITY_PLATFORMS)
     _LOGGER.debug("✅ Plattformen erfolgreich registriert!")
+
+    # Ein gemeinsamer Scheduler taktet die Abfragen aller Hubs (versetzt, parallel, begrenzt).
+    # Erst jetzt starten: die Entitäten haben ihre Keys angemeldet, sonst liefe der
+    # erste Poll mit leerem Routing-Index
+    scheduler = hass.data[DOMAIN].get("scheduler")
+    if scheduler is None:
+        scheduler = hass.data[DOMAIN]["scheduler"] = PowerDogPollScheduler(hass)
+    entry.async_on_unload(
+        scheduler.async_add(
+            coordinator,
+            hub.interval,
+            adaptive=entry.options.get(CONF_ADAPTIVE_POLLING, False),
+            immediate=True,  # Erster Poll im Hintergrund
+        )
+    )
+
+    if hub.sampler is not None:
+        # Sampelt zwischen den Polls in die Ringpuffer; endet mit dem Config-Entry
+        hub.track_task(entry.async_create_background_task(hass, hub.sampler.async_run(), f"{DOMAIN}_sampling"))
+
+    return True
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Entlädt die Plattformen und beendet alle laufenden Abfragen und Befehle des Hubs.
+
+    Scheduler-Takt und Hintergrund-Tasks werden vor dem Schließen der Verbindung
+    beendet; Listener hängen an ``entry.async_on_unload`` und werden von Home
+    Assistant entfernt.
+    """
+    if not await hass.config_entries.async_unload_platforms(entry, ENTITY_PLATFORMS):
+        return False
+
+    data = hass.data[DOMAIN].pop(entry.entry_id)
+    hass.data[DOMAIN]["scheduler"].async_remove(data["coordinator"])
+    data["coordinator"].async_cancel_expiry()
+    await data["hub"].async_shutdown()
+    _LOGGER.debug(f"🧹 PowerDog {data['hub'].host} entladen")
+    return True
+
+
+def _settle_time(entry: ConfigEntry) -> float:
+    """Wartezeit der Number-Entitäten vor dem Senden aus den Optionen."""
+    return float(entry.options.get(CONF_NUMBER_SETTLE_TIME, DEFAULT_NUMBER_SETTLE_TIME))
+
+
+def _fast_sampling(entry: ConfigEntry) -> float:
+    """Intervall des schnellen Samplings aus den Optionen (0 = aus)."""
+    return float(entry.options.get(CONF_FAST_SAMPLING_INTERVAL, 0) or 0)
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry):
+    """Übernimmt geänderte Optionen.
+
+    Intervall, adaptives Polling, Deadbands, Poll-Stufen und Wartezeit der Numbers gelten sofort; geänderte
+    Verbindungsdaten, schnelles Sampling, Mitschnitt, Statistik-Import oder abgeleitete
+    Sensoren erfordern ein Neuladen.
+    """
+    data = hass.data[DOMAIN].get(entry.entry_id)
+    if data is None:
+        return
+
+    hub, coordinator = data["hub"], data["coordinator"]
+    config = {**entry.data, **entry.options}
+    connection = (config[CONF_HOST], config.get(CONF_PORT, 20000), config[CONF_PASSWORD])
+    recording = entry.options.get(CONF_RECORD_TRAFFIC, False)
+    if (
+        connection != (hub.host, hub.port, hub.password)
+        or _fast_sampling(entry) != hub.fast_sampling
+        or recording != (hub.api.recorder is not None)
+        or entry.options.get(CONF_IMPORT_STATISTICS, False) != (hub.energy is not None)
+        or entry.options.get(CONF_DERIVED_SENSORS, "") != hub.derived.text
+    ):
+        _LOGGER.info(f"🔄 PowerDog {hub.host}: Verbindung bzw. Betriebsart geändert, lade neu")
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    hub.interval = config.get(CONF_INTERVAL, 30)
+    hub.deadband = DeadbandFilter.from_options(entry.options)
+    hub.settle_time = _settle_time(entry)
+    hub.set_tiers(PollTiers.from_options(entry.options))
+    adaptive = entry.options.get(CONF_ADAPTIVE_POLLING, False)
+    if hub.sampler is not None:
+        hub.sampler.resize(hub.interval, adaptive)
+    hass.data[DOMAIN]["scheduler"].async_update(coordinator, hub.interval, adaptive)
+    _LOGGER.debug(f"⚙️ PowerDog {hub.host}: Optionen übernommen, Intervall {hub.interval}s")
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migriert Config-Entries älterer Versionen.
+
+    Version 1 → 2: Die Unique-IDs enthalten die Entry-ID. Vorher kollidierten
+    gleiche Keys mehrerer PowerDogs, und nur der zuerst geladene bekam
+    Entitäten; bestehende Registry-Einträge behalten ihre Entity-ID. Die
+    Diagnose-Sensoren erhalten ein eigenes Präfix (``powerdog_diag_``).
+    """
+    if entry.version == 1:
+        migrated = 0
+
+        @callback
+        def async_migrate(entity_entry: er.RegistryEntry):
+            nonlocal migrated
+            unique_id = migrate_unique_id(entity_entry.domain, entry.entry_id, entity_entry.unique_id)
+            if unique_id is None:
+                return None
+            migrated += 1
+            return {"new_unique_id": unique_id}
+
+        await er.async_migrate_entries(hass, entry.entry_id, async_migrate)
+        hass.config_entries.async_update_entry(entry, version=2)
+        _LOGGER.info(f"ℹ️ PowerDog {entry.title}: {migrated} Unique-IDs auf Version 2 migriert")
     return True
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Entfernt den Discovery-Cache, wenn der Config-Entry gelöscht wird."""
+    await PowerDogDiscoveryCache(hass, entry.entry_id).async_remove()
+
+
+def _inventory_signature(inventory: dict) -> frozenset:
+    """Merkmale des Inventars, die bestimmen, welche Entitäten angelegt werden."""
+    return frozenset(
+        (info.get("Key"), info.get("Setable", ""), info.get("LinearType", ""))
+        for info in inventory.values()
+    )
+
+
+async def _async_rediscover(hass: HomeAssistant, entry: ConfigEntry, hub, cache):
+    """Gleicht das Inventar mit dem Gerät ab und aktualisiert den Discovery-Cache.
+
+    Neue Keys werden den Plattformen gemeldet, entfernte Entitäten aus der
+    Entity-Registry gelöscht; unveränderte Entitäten bleiben unberührt.
+    """
+    inventory = await hub.async_fetch_inventory()
+    if not inventory:
+        _LOGGER.warning("⚠️ PowerDog Discovery fehlgeschlagen, verwende weiter das bisherige Inventar")
+        return
+
+    await cache.async_save(inventory)
+    if _inventory_signature(inventory) == hub.signature:
+        return
+
+    added, removed = hub.apply_inventory(inventory)
+    _LOGGER.info(
+        f"ℹ️ PowerDog Geräteinventar hat sich geändert: {sum(map(len, added.values()))} neu, "
+        f"{sum(map(len, removed.values()))} entfernt"
+    )
+
+    registry = er.async_get(hass)
+    for platform, keys in removed.items():
+        for key in keys:
+            entity_id = registry.async_get_entity_id(platform, DOMAIN, unique_id_for(platform, entry.entry_id, key))
+            if entity_id is not None:
+                registry.async_remove(entity_id)
+
+    for platform, keys in added.items():
+        if keys:
+            async_dispatcher_send(
+                hass, SIGNAL_NEW_ENTITIES.format(entry_id=entry.entry_id, platform=platform), keys
+            )
+
+
 class PowerDogHub:
     """Verwaltet die Kommunikation mit der PowerDog API."""
 
-    def __init__(self, hass: HomeAssistant, host: str, port: int, password: str, interval: int):
+    def __init__(self, hass: HomeAssistant, host: str, port: int, password: str, interval: int,
+                 deadband: DeadbandFilter | None = None, fast_sampling: float = 0,
+                 api: PowerDogApiClient | None = None, settle_time: float = DEFAULT_NUMBER_SETTLE_TIME,
+                 tiers: PollTiers | None = None, derived: PowerDogDerived | None = None):
         """Initialisiere PowerDog API-Verbindung."""
         self.hass = hass
         self.host = host
         self.port = port
         self.password = password
         self.interval = interval
-        self.client = xmlrpc.client.ServerProxy(f"http://{host}:{port}/")
-
+        self.api = api or PowerDogApiClient(host, port, password)
+        self.metrics = self.api.metrics
+        self.deadband = deadband or DeadbandFilter()
+
+        # Serialisiert Poll und Schreibbefehle, damit sie sich auf dem Gerät nie überlappen
+        self.lock = asyncio.Lock()
+        self.commands = PowerDogCommandQueue(self)
+        # Number-Entitäten senden erst, wenn der Wert so lange unverändert geblieben ist
+        self.settle_time = settle_time
+        # Gezielte Rückmeldung nach Befehlen: angefragte Keys und laufender Abruf
+        self._read_back_keys = set()
+        self._read_back_task = None
+        # Hintergrund-Tasks (Sampling, Discovery), die vor dem Schließen enden müssen
+        self._tasks = set()
+
+        # Key → PowerDogValue, je Plattform und insgesamt (inkl. Usage-Sensoren)
         self.sensors = {}
         self.switches = {}
         self.selects = {}
         self.numbers = {}
+        self.values = {}
+        # Key aus getAllCurrentLinearValues → ((Feld, Default, Datensatz), ...)
+        self._routes = {}
+        # Merkmale des geladenen Inventars (siehe ``_inventory_signature``)
+        self.signature = frozenset()
+        # Keys mit mindestens einer aktiven Entität in Home Assistant (Key → Anzahl Entitäten)
+        self.enabled_keys = {}
+        # Routing-Index ohne deaktivierte Keys; wird bei Änderungen vor dem nächsten Poll neu aufgebaut
+        self._active_routes = {}
+        self._active_dirty = True
+        # Poll-Stufen: Routing-Index ohne die langsame Spur und wann diese wieder fällig ist
+        self.tiers = tiers or PollTiers()
+        self._fast_routes = {}
+        self._slow_due = None
+        # Vom Hub berechnete Sensoren und ihre Quell-Keys (Key → Keys, die gepollt werden müssen)
+        self.derived = derived or PowerDogDerived()
+        self._derived_sources = {}
+        # Anzahl der Werte in der letzten Antwort von getAllCurrentLinearValues
+        self.last_value_count = 0
+        # Zeitpunkt des letzten erfolgreichen Polls (last-known-good Snapshot)
+        self.last_good_update = None
+        # Optionales schnelles Sampling; die Polls veröffentlichen dann nur noch das Fenster
+        self.fast_sampling = fast_sampling
+        self.sampler = PowerDogSampler(self, fast_sampling) if fast_sampling > 0 else None
+        # Optionaler stündlicher Import der Counter als Langzeitstatistik (wird beim Setup gesetzt)
+        self.energy = None
+
+    async def async_fetch(self, method, *params):
+        """Asynchrone API-Abfrage; liefert das Reply-Feld oder {} bei Fehlern."""
+        try:
+            response = await self.api.async_call(method, *params)
+        except PowerDogApiError as e:
+            response = e
+        reply = self._reply(method, response)
+        return {} if reply is None else reply
+
+    async def async_fetch_many(self, methods) -> list:
+        """Fragt mehrere parameterlose API-Methoden gleichzeitig bzw. per Multicall ab.
+
+        Liefert je Methode das Reply-Feld oder None, wenn sie fehlgeschlagen ist.
+        """
+        try:
+            responses = await self.api.async_call_many([(method, ()) for method in methods])
+        except PowerDogApiError as e:
+            _LOGGER.error(f"❌ PowerDog API-Fehler bei {', '.join(methods)}: {e}")
+            return [None for _ in methods]
+        return [self._reply(method, response) for method, response in zip(methods, responses)]
+
+    @property
+    def snapshot_max_age(self) -> timedelta:
+        """Wie alt der letzte gültige Snapshot werden darf, bevor er als veraltet gilt."""
+        return timedelta(seconds=self.interval * SNAPSHOT_MAX_AGE_INTERVALS)
+
+    @property
+    def snapshot_fresh(self) -> bool:
+        """True, solange der letzte gültige Snapshot jünger als ``snapshot_max_age`` ist."""
+        return (
+            self.last_good_update is not None
+            and dt_util.utcnow() - self.last_good_update <= self.snapshot_max_age
+        )
+
+    @staticmethod
+    def _reply(method, response):
+        """Liefert das Reply-Feld einer API-Antwort oder None bei Fehlern."""
+        if isinstance(response, PowerDogCircuitOpenError):
+            _LOGGER.debug(f"🔌 {method} übersprungen: {response}")
+            return None
+
+        if isinstance(response, Exception):
+            _LOGGER.error(f"❌ PowerDog API-Fehler bei {method}: {response}")
+            return None
+
+        if isinstance(response, dict) and response.get("ErrorCode") == 0:
+            return response.get("Reply", {})
+
+        _LOGGER.error(f"⚠️ Fehler bei API-Aufruf {method}: {response}")
+        return None
+
+    async def async_set_regulation_parameters(self, key, parameters) -> bool:
+        """Setzt mehrere Regelparameter eines Keys in der angegebenen Reihenfolge.
+
+        Die Befehle laufen über die Command-Queue: überholte Werte werden
+        verworfen und alles Anstehende in einem Multicall gesendet.
+        """
+        return await self.commands.async_set(key, parameters)
+
+    async def async_set_regulation_parameter(self, key, parameter, value) -> bool:
+        """Setzt einen Regelparameter (z.B. manual, value, onoff) auf dem Gerät."""
+        return await self.async_set_regulation_parameters(key, [(parameter, value)])
+
+    async def async_read_back(self, key):
+        """Liest ``key`` nach einem Schreibbefehl gezielt vom Gerät zurück.
+
+        Statt auf den nächsten vollständigen Poll zu warten, wird nur
+        getRegulations abgefragt und nur die angefragten Keys übernommen.
+        Gleichzeitige Anfragen teilen sich einen Aufruf. Liefert den
+        aktualisierten Datensatz oder None, wenn das Gerät nicht geantwortet hat.
+        """
+        self._read_back_keys.add(key)
+        if self._read_back_task is None:
+            self._read_back_task = self.hass.async_create_task(self._async_read_back())
+        updated = await self._read_back_task
+        return self.values.get(key) if key in updated else None
+
+    async def _async_read_back(self) -> set:
+        """Fragt getRegulations ab und übernimmt die Werte der angefragten Keys."""
+        await asyncio.sleep(READ_BACK_DELAY)
+        # Ab hier eintreffende Anfragen starten einen neuen Abruf
+        keys, self._read_back_keys = self._read_back_keys, set()
+        self._read_back_task = None
+
+        async with self.lock:
+            regulations = await self.async_fetch("getRegulations")
+
+        updated = set()
+        for info in regulations.values():
+            key = info.get("Key")
+            record = self.values.get(key) if key in keys else None
+            if record is None:
+                continue
+            record.value = info.get("Current_Value", record.value)
+            record.switch_mode = info.get("SwitchMode", record.switch_mode)
+            record.switch_state = info.get("SwitchState", record.switch_state)
+            record.on_off = info.get("OnOff", record.on_off)
+            updated.add(key)
+
+        _LOGGER.debug(f"🔁 Rückmeldung für {len(updated)} von {len(keys)} Keys erhalten")
+        return updated
+
+    async def async_close(self):
+        """Schließt die Verbindung zum Gerät."""
+        await self.api.async_close()
+
+    def track_task(self, task: asyncio.Task):
+        """Merkt eine Hintergrund-Task vor; ``async_shutdown`` bricht sie vor dem Schließen ab."""
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def async_shutdown(self):
+        """Verwirft anstehende Befehle, bricht Rückmeldungen und Tasks ab und schließt die Verbindung."""
+        self.commands.cancel()
+        if self._read_back_task is not None:
+            self._read_back_task.cancel()
+            self._read_back_task = None
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        # Erst schließen, wenn keine Task mehr eine Verbindung öffnen kann
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.async_close()
 
     async def async_fetch_data(self):
-        """Lade ALLE Sensordaten in separaten API-Requests."""
+        """Lade das Inventar vom Gerät und ordne es den Plattformen zu.
+
+        Liefert das Rohinventar oder None, wenn das Gerät nicht vollständig geantwortet hat.
+        """
+        all_data = await self.async_fetch_inventory()
+
+        if not all_data:
+            _LOGGER.error("❌ API-Antwort ist leer oder unvollständig!")
+            return None
+
+        self.load_inventory(all_data)
+        return all_data
+
+    async def async_fetch_inventory(self) -> dict | None:
+        """Lade ALLE Sensordaten in einem Multicall bzw. parallelen API-Requests.
+
+        Liefert None, sobald eine der Methoden fehlschlägt: ein Teilinventar
+        würde ganze Kategorien als entfernt erscheinen lassen.
+        """
         _LOGGER.debug("📡 Hole Sensordaten von PowerDog API...")
 
-        def fetch(method):
-            """Synchrone API-Abfrage in separatem Thread."""
-            try:
-                response = getattr(self.client, method)(self.password)
-                if response.get("ErrorCode") == 0:
-                    return response.get("Reply", {})
-                else:
-                    _LOGGER.error(f"⚠️ Fehler bei API-Aufruf {method}: {response}")
-                    return {}
-            except Exception as e:
-                _LOGGER.error(f"❌ PowerDog API-Fehler bei {method}: {e}")
-                return {}
-
-        # ❗ **Jetzt ALLE API-Methoden getrennt abrufen!**
-        sensors_data = await asyncio.to_thread(fetch, "getSensors")
-        counters_data = await asyncio.to_thread(fetch, "getCounters")
-        regulations_data = await asyncio.to_thread(fetch, "getRegulations")
-        linear_devices_data = await asyncio.to_thread(fetch, "getLinearDevices")
+        replies = await self.async_fetch_many(DISCOVERY_METHODS)
+        failed = [method for method, reply in zip(DISCOVERY_METHODS, replies) if reply is None]
+        if failed:
+            _LOGGER.warning(f"⚠️ PowerDog Discovery unvollständig, fehlgeschlagen: {', '.join(failed)}")
+            return None
 
+        sensors_data, counters_data, regulations_data, linear_devices_data = replies
         all_data = {**sensors_data, **counters_data, **regulations_data, **linear_devices_data}
+        _LOGGER.debug(f"📊 API-Rohdaten geladen: {len(all_data)} Einträge")
+        return all_data
 
-        if not all_data:
-            _LOGGER.error("❌ API-Antwort ist leer!")
-            return
+    def load_inventory(self, all_data: dict):
+        """Ordnet das Rohinventar den Plattformen (Sensor, Switch, Select, Number) zu.
 
-        _LOGGER.debug(f"📊 API-Rohdaten geladen: {len(all_data)} Einträge")
+        Je Key entsteht ein kompakter ``PowerDogValue``-Datensatz, den sich alle
+        Plattformen teilen. Dazu wird der Routing-Index aufgebaut, über den
+        ``async_update_values`` jeden Wert mit einem einzigen Lookup zuordnet;
+        abgefragt werden davon nur Keys mit aktiver Entität (``active_routes``).
+        """
+        previous = self.values
+        self.sensors = {}
+        self.switches = {}
+        self.selects = {}
+        self.numbers = {}
+        self.values = {}
+        self._routes = {}
+        self.signature = _inventory_signature(all_data)
+
+        def reuse(record):
+            """Behält den Datensatz eines bekannten Keys, damit Wert und Meldestatus erhalten bleiben."""
+            existing = previous.get(record.key)
+            if existing is None:
+                return record
+            existing.update_from(record)
+            return existing
 
         for entity_id, entity_info in all_data.items():
             key = entity_info.get("Key")  # Eindeutige Geräte-ID
@@ -94,91 +551,334 @@ class PowerDogHub:
             setable = entity_info.get("Setable", "")
             linear_type = entity_info.get("LinearType", "")
 
+            record = reuse(PowerDogValue.from_info(key, entity_info))
+            self.values[key] = record
+            routes = [("Current_Value", None, record)]
+
             if "onoff(bool)" in setable:
-                self.switches[key] = entity_info
+                self.switches[key] = record
             if "manual(bool)" in setable:
-                self.selects[key] = entity_info
+                self.selects[key] = record
             if "value(double)" in setable:
-                self.numbers[key] = entity_info
+                self.numbers[key] = record
 
             if not setable:
-                self.sensors[key] = entity_info  # Standard-Sensor
+                self.sensors[key] = record  # Standard-Sensor
+                record.filtered = True
 
             # Zusätzliche Zählerwerte nur für Counter speichern
             if linear_type == "counter":
-                for usage_type in ["30Day_Usage", "Today_Usage", "Year_Usage"]:
+                for usage_type in USAGE_TYPES:
                     if usage_type in entity_info:
-                        usage_entity_id = f"{key}_{usage_type.lower()}"
+                        usage_record = self.sensors.get(usage_key(key, usage_type))
+                        if usage_record is None:
+                            usage_record = reuse(PowerDogValue.usage_from_info(key, usage_type, entity_info))
+                            usage_record.filtered = True
+                            self.sensors[usage_record.key] = usage_record
+                            self.values[usage_record.key] = usage_record
+                        routes.append((usage_type, 0, usage_record))
 
-                        if usage_entity_id not in self.sensors:
-                            base_unit = entity_info.get("Unit", "W")
-                            time_unit = entity_info.get("Unit_Time_Add", "")
+            self._routes[key] = tuple(routes)
 
-                            if time_unit.lower() == "h":
-                                correct_unit = base_unit + "h"  # z.B. "Wh", "kWh", "MWh"
-                            else:
-                                correct_unit = base_unit
+        self._bind_derived(reuse)
+        self._active_dirty = True
 
-                            self.sensors[usage_entity_id] = {
-                                "Name": f"{entity_info.get('Name', 'Unknown')} {usage_type.replace('_', ' ')}",
-                                "Current_Value": entity_info[usage_type],
-                                "Unit": correct_unit,
-                            }
+        _LOGGER.debug(f"✅ PowerDog API-Daten geladen: {len(self.sensors)} Sensoren, {len(self.switches)} Switches, {len(self.numbers)} Numbers")
 
+    def _bind_derived(self, reuse):
+        """Legt die abgeleiteten Sensoren für das aktuelle Inventar an.
 
+        Aktive abgeleitete Sensoren halten ihre Quell-Keys aktiv, auch wenn
+        deren eigene Entitäten deaktiviert sind; geänderte Quellen werden umgemeldet.
+        """
+        if not self.derived.definitions and not self._derived_sources:
+            return
 
-        _LOGGER.debug(f"✅ PowerDog API-Daten geladen: {len(self.sensors)} Sensoren, {len(self.switches)} Switches, {len(self.numbers)} Numbers")
+        sources = self.derived.bind(self.values, reuse)
+        for key, record in self.derived.records.items():
+            self.sensors[key] = record
+            self.values[key] = record
+
+        previous, self._derived_sources = self._derived_sources, sources
+        for key in self.enabled_keys.keys() & (previous.keys() | sources.keys()):
+            for source in sources.get(key, ()):
+                self.enable_key(source)
+            for source in previous.get(key, ()):
+                self.disable_key(source)
+
+    def platform_records(self, platform: str) -> dict:
+        """Key → Datensatz der Entitäten einer Plattform."""
+        return {
+            "sensor": self.sensors,
+            "switch": self.switches,
+            "select": self.selects,
+            "number": self.numbers,
+        }[platform]
+
+    def snapshot_values(self, platforms=None, pattern=None, compact: bool = False) -> dict:
+        """Aktueller Wertebestand des Hubs für den Service ``get_snapshot``.
+
+        Enthalten sind nur Keys mit aktiver Entität, da nur deren Werte
+        gepollt werden. ``platforms`` beschränkt auf Plattformen,
+        ``pattern`` ist ein kompilierter Regex über die Keys. Mit ``compact``
+        werden Keys, Werte und Einheiten als parallele Listen geliefert.
+        """
+        if platforms:
+            records = {}
+            for platform in platforms:
+                records.update(self.platform_records(platform))
+        else:
+            records = self.values
+        enabled = self.enabled_keys
+        selected = [
+            record for key, record in records.items()
+            if key in enabled and (pattern is None or pattern.match(key))
+        ]
+
+        snapshot = {
+            "host": self.host,
+            "updated": self.last_good_update.isoformat() if self.last_good_update else None,
+            "fresh": self.snapshot_fresh,
+        }
+        if self.sampler is not None and self.sampler.last_sample is not None:
+            snapshot["sampled"] = self.sampler.last_sample.isoformat()
+
+        if compact:
+            snapshot["keys"] = [record.key for record in selected]
+            snapshot["values"] = [record.value for record in selected]
+            snapshot["units"] = [record.unit for record in selected]
+            return snapshot
+
+        values = {}
+        for record in selected:
+            entry = {"name": record.name, "value": record.value, "unit": record.unit}
+            if record.stats is not None:
+                entry["min"], entry["max"], entry["mean"], entry["samples"] = record.stats
+            values[record.key] = entry
+        snapshot["values"] = values
+        return snapshot
+
+    def apply_inventory(self, all_data: dict) -> tuple[dict, dict]:
+        """Übernimmt ein neu gefundenes Inventar und liefert die Änderungen je Plattform.
+
+        Liefert ``(hinzugefügt, entfernt)``, jeweils Plattform → Menge der Keys.
+        Datensätze unveränderter Keys bleiben dieselben Objekte.
+        """
+        before = {platform: set(self.platform_records(platform)) for platform in ENTITY_PLATFORMS}
+        self.load_inventory(all_data)
+        after = {platform: set(self.platform_records(platform)) for platform in ENTITY_PLATFORMS}
+        return (
+            {platform: after[platform] - before[platform] for platform in ENTITY_PLATFORMS},
+            {platform: before[platform] - after[platform] for platform in ENTITY_PLATFORMS},
+        )
+
+    def enable_key(self, key):
+        """Meldet eine aktive Entität für ``key`` an; der Key wird ab dem nächsten Poll verarbeitet."""
+        count = self.enabled_keys.get(key, 0)
+        self.enabled_keys[key] = count + 1
+        if not count:
+            self._active_dirty = True
+            for source in self._derived_sources.get(key, ()):
+                self.enable_key(source)  # Abgeleiteter Sensor braucht seine Quellwerte
+
+    def disable_key(self, key):
+        """Meldet eine Entität für ``key`` ab; ohne aktive Entität wird der Key übersprungen."""
+        count = self.enabled_keys.get(key, 0) - 1
+        if count > 0:
+            self.enabled_keys[key] = count
+            return
+        if self.enabled_keys.pop(key, None) is None:
+            return
+        self._active_dirty = True
+        for source in self._derived_sources.get(key, ()):
+            self.disable_key(source)
 
-    async def async_update_loop(self):
-        """Regelmäßige Aktualisierung der PowerDog API-Werte."""
-        while True:
-            _LOGGER.debug("🔄 PowerDog Update wurde getriggert.")
-            await self.async_update_values()
-            await asyncio.sleep(self.interval)  # Alle 60 Sekunden abrufen
+    def set_tiers(self, tiers: PollTiers):
+        """Übernimmt geänderte Poll-Stufen; die langsame Spur ist beim nächsten Poll fällig."""
+        if tiers == self.tiers:
+            return
+        self.tiers = tiers
+        self._slow_due = None
+        self._active_dirty = True
+
+    @property
+    def active_routes(self) -> dict:
+        """Routing-Index, eingeschränkt auf Datensätze mit aktiver Entität."""
+        if self._active_dirty:
+            enabled = self.enabled_keys
+            active = {}
+            for key, targets in self._routes.items():
+                kept = tuple(target for target in targets if target[2].key in enabled)
+                if kept:
+                    active[key] = kept
+            self._active_routes = active
+            self._fast_routes = self._split_fast_routes(active)
+            self._active_dirty = False
+            if self.sampler is not None:
+                self.sampler.load()
+            _LOGGER.debug(
+                f"🧭 Routing-Index: {len(active)} von {len(self._routes)} Keys aktiv, "
+                f"{len(self._fast_routes)} in der schnellen Spur"
+            )
+        return self._active_routes
+
+    @property
+    def fast_routes(self) -> dict:
+        """Routing-Index der schnellen Spur (ohne Stufen: ``active_routes``)."""
+        self.active_routes  # Baut bei Bedarf beide Indizes neu auf
+        return self._fast_routes
+
+    def _split_fast_routes(self, active: dict) -> dict:
+        """Routing-Index ohne die Datensätze der langsamen Spur."""
+        tiers = self.tiers
+        if not tiers.enabled:
+            return active
+        fast = {}
+        for key, targets in active.items():
+            kept = tuple(target for target in targets if not tiers.is_slow(target[2]))
+            if kept:
+                fast[key] = kept
+        return fast
+
+    def poll_routes(self) -> tuple[dict, bool]:
+        """Routing-Index für die nächste Abfrage und ob er die langsame Spur enthält.
+
+        Die langsame Spur ist fällig, bis eine Abfrage mit ihr gelungen ist
+        (``mark_slow_polled``); danach wieder nach ``tiers.slow_interval``.
+        """
+        routes, fast = self.active_routes, self._fast_routes
+        if routes is fast:
+            return routes, True  # Keine Stufen → immer alles
+        if self._slow_due is None or time.monotonic() >= self._slow_due:
+            return routes, True
+        return fast, False
+
+    def mark_slow_polled(self):
+        """Die langsame Spur ist aktuell; nächste Verarbeitung nach ``tiers.slow_interval``."""
+        if self.tiers.enabled:
+            self._slow_due = time.monotonic() + self.tiers.slow_interval
 
     async def async_update_values(self):
-        """Holt aktuelle Werte von PowerDog und speichert sie."""
+        """Holt aktuelle Werte von PowerDog und speichert sie.
+
+        Liefert die Menge der Keys, deren Wert sich seit der letzten Meldung
+        (bei Sensoren: über die Deadband hinaus) geändert hat, oder None,
+        wenn keine Werte kamen.
+
+        Mit schnellem Sampling wird nicht abgefragt, sondern das Fenster seit
+        dem letzten Aufruf veröffentlicht (``_publish_samples``); nur wenn es
+        leer ist (z.B. direkt nach dem Start), wird normal abgefragt.
+        """
+        if self.sampler is not None:
+            changed = self._publish_samples()
+            if changed is not None:
+                return changed
+
         _LOGGER.debug("📡 Rufe aktuelle Werte über getAllCurrentLinearValues ab...")
 
-        def fetch():
-            """Synchrone API-Abfrage für aktuelle Werte."""
+        # Die Antwort wird beim Empfang geparst und direkt in die Datensätze geschrieben;
+        # Werte der langsamen Spur nur, wenn sie fällig ist
+        routes, slow = self.poll_routes()
+        if not routes:
+            _LOGGER.debug("📭 Keine aktiven PowerDog Entitäten, Abfrage übersprungen")
+            return set()
+        parser = LinearValuesParser(routes)
+        async with self.lock:
             try:
-                response = self.client.getAllCurrentLinearValues(self.password)
-                if isinstance(response, dict) and response.get("ErrorCode") == 0:
-                    return response.get("Reply", {})
-                else:
-                    _LOGGER.error(f"⚠️ Fehlerhafte Antwort von getAllCurrentLinearValues: {response}")
-                    return {}
-            except Exception as e:
+                await self.api.async_call_streaming("getAllCurrentLinearValues", parser)
+            except PowerDogCircuitOpenError as e:
+                _LOGGER.debug(f"🔌 getAllCurrentLinearValues übersprungen: {e}")
+                return None
+            except PowerDogApiError as e:
                 _LOGGER.error(f"❌ Fehler beim Abrufen der aktuellen Werte: {e}")
-                return {}
+                return None
 
-        values = await asyncio.to_thread(fetch)
+        if parser.error_code != 0:
+            _LOGGER.error(f"⚠️ Fehlerhafte Antwort von getAllCurrentLinearValues: ErrorCode {parser.error_code}")
+            return None
 
-        if not values:
+        if not parser.count:
             _LOGGER.warning("⚠️ Keine aktuellen Werte erhalten.")
+            return None
+
+        _LOGGER.debug(f"📊 {parser.count} aktuelle Werte von PowerDog erhalten.")
+        self.last_value_count = parser.count
+        if parser.touched:
+            # Ohne beschriebene Datensätze ist der Snapshot nicht aktueller geworden
+            self.last_good_update = dt_util.utcnow()
+            if slow:
+                self.mark_slow_polled()
+
+        changed = set()
+        for record in parser.touched:
+            self._track_change(record, changed)
+        self._update_derived(changed)
+
+        _LOGGER.debug(f"✅ PowerDog Werte erfolgreich aktualisiert, {len(changed)} geändert!")
+        return changed
+
+    def _publish_samples(self):
+        """Veröffentlicht das Sampling-Fenster seit dem letzten Poll.
+
+        Sensoren mit Ringpuffer melden den Mittelwert des Fensters als Zustand
+        und Min/Max/Mittelwert als Attribute; alle anderen Keys den letzten Wert.
+        """
+        window = self.sampler.take_window()
+        if window is None:
+            _LOGGER.debug("📭 Keine PowerDog Samples im letzten Intervall, frage direkt ab")
+            return None
+
+        touched, stats = window
+        self.last_good_update = self.sampler.last_sample
+
+        changed = set()
+        for record in touched:
+            window_stats = stats.get(record.key)
+            if window_stats is None:
+                self._track_change(record, changed)
+                continue
+
+            record.value = window_stats[2]
+            self._track_change(record, changed)
+            if record.key not in changed and self._peaks_changed(record, window_stats):
+                record.published = record.value
+                changed.add(record.key)
+            if record.key in changed:
+                record.stats = window_stats
+        self._update_derived(changed)
+
+        _LOGGER.debug(f"✅ PowerDog Sampling-Fenster veröffentlicht, {len(changed)} geändert!")
+        return changed
+
+    def _update_derived(self, changed):
+        """Berechnet alle aktiven abgeleiteten Sensoren einmal aus dem aktuellen Wertebestand."""
+        if not self.derived.definitions:
             return
-
-        _LOGGER.debug(f"📊 {len(values)} aktuelle Werte von PowerDog erhalten.")
-
-        # Setze die aktuellen Werte in den Entitäten
-        for entity_id, value_data in values.items():
-            current_value = value_data.get("Current_Value")
-
-            if entity_id in self.sensors:
-                self.sensors[entity_id]["Current_Value"] = current_value
-            if entity_id in self.switches:
-                self.switches[entity_id]["Current_Value"] = current_value
-            if entity_id in self.numbers:
-                self.numbers[entity_id]["Current_Value"] = current_value
-            if entity_id in self.selects:
-                self.selects[entity_id]["Current_Value"] = current_value
-
-            # Falls es ein Counter ist, auch die Usage-Werte aktualisieren
-            if entity_id in self.sensors and self.sensors[entity_id].get("LinearType") == "counter":
-                for usage_type in ["30Day_Usage", "Today_Usage", "Year_Usage"]:
-                    usage_entity_id = f"{entity_id}_{usage_type.lower()}"
-                    if usage_entity_id in self.sensors:
-                        self.sensors[usage_entity_id]["Current_Value"] = value_data.get(usage_type, 0)
-
-        _LOGGER.debug("✅ PowerDog Werte erfolgreich aktualisiert!")
\ No newline at end of file
+        enabled = self.enabled_keys
+        for record, value in self.derived.compute():
+            if value is not None and record.key in enabled:
+                record.value = value
+                self._track_change(record, changed)
+
+    def _peaks_changed(self, record, window_stats) -> bool:
+        """True, wenn Min oder Max des Fensters über die Deadband vom zuletzt gemeldeten abweichen."""
+        if record.stats is None:
+            return True
+        return (
+            self.deadband.is_significant(record.key, window_stats[0], record.stats[0])
+            or self.deadband.is_significant(record.key, window_stats[1], record.stats[1])
+        )
+
+    def _track_change(self, record, changed):
+        """Merkt den Key in ``changed`` vor, wenn der Wert neu gemeldet werden muss."""
+        value = record.value
+        if record.published is not UNPUBLISHED:
+            if record.filtered:
+                significant = self.deadband.is_significant(record.key, value, record.published)
+            else:
+                significant = value != record.published
+            if not significant:
+                return
+
+        record.published = value
+        changed.add(record.key)
@@ -0,0 +1,251 @@
+"""Asynchroner XML-RPC-Client für die PowerDog API."""
+import asyncio
+import logging
+import time
+import xmlrpc.client
+from xml.parsers.expat import ExpatError
+
+import aiohttp
+
+from .breaker import CircuitBreaker
+from .metrics import PowerDogMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10  # Sekunden pro API-Aufruf
+DEFAULT_POOL_SIZE = 4  # Maximale Anzahl gleichzeitiger Verbindungen zum Gerät
+KEEPALIVE_TIMEOUT = 30  # Sekunden, die eine freie Verbindung offen bleibt
+STREAM_CHUNK_SIZE = 16384  # Bytes, die beim Streaming pro Schritt an den Parser gehen
+
+
+class PowerDogApiError(Exception):
+    """Fehler bei der Kommunikation mit der PowerDog API."""
+
+
+class PowerDogApiFault(PowerDogApiError):
+    """Das Gerät hat mit einem XML-RPC-Fault geantwortet."""
+
+
+class PowerDogTransportError(PowerDogApiError):
+    """Das Gerät war nicht erreichbar (Timeout, Verbindungsfehler)."""
+
+
+class PowerDogCircuitOpenError(PowerDogTransportError):
+    """Aufruf nicht gesendet, weil der Circuit Breaker offen ist."""
+
+
+class PowerDogApiClient:
+    """XML-RPC über aiohttp mit begrenztem Keep-Alive-Verbindungspool.
+
+    Läuft vollständig im Event-Loop: keine Threads, keine geteilte
+    ``ServerProxy``-Instanz. Überzählige Aufrufe warten im Pool, bis eine
+    Verbindung frei wird. Ein Circuit Breaker lässt Aufrufe sofort
+    scheitern, solange das Gerät nicht erreichbar ist.
+    """
+
+    def __init__(self, host: str, port: int, password: str,
+                 timeout: float = DEFAULT_TIMEOUT, pool_size: int = DEFAULT_POOL_SIZE):
+        """Initialisiere den Client (die Session wird erst beim ersten Aufruf erstellt)."""
+        self.url = f"http://{host}:{port}/"
+        self.password = password
+        self.timeout = timeout
+        self.pool_size = pool_size
+        # None = noch unbekannt, wird beim ersten Batch ermittelt
+        self.multicall_supported = None
+        self.breaker = CircuitBreaker()
+        self.metrics = PowerDogMetrics()
+        # Optionaler Mitschnitt aller Requests und Antworten (siehe recording.py)
+        self.recorder = None
+        self._session = None
+        self._closed = False
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Gibt die Session zurück und erstellt sie bei Bedarf im Event-Loop."""
+        if self._closed:
+            raise PowerDogApiError(f"Verbindung zu {self.url} wurde geschlossen")
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"Content-Type": "text/xml"},
+            )
+        return self._session
+
+    async def async_call(self, method: str, *params, timeout: float | None = None):
+        """Ruft eine API-Methode auf. Das Passwort wird immer als erster Parameter gesendet."""
+        body = xmlrpc.client.dumps((self.password, *params), method)
+        payload = await self._async_post(body.encode(), timeout, method)
+        return self._decode(payload, method)
+
+    async def async_call_streaming(self, method: str, parser, *params, timeout: float | None = None):
+        """Wie ``async_call``, aber die Antwort geht beim Empfang stückweise an ``parser``.
+
+        ``parser`` braucht ``feed(chunk)`` und ``close()``; beide werfen
+        ``PowerDogApiError`` bei ungültigen Antworten.
+        """
+        body = xmlrpc.client.dumps((self.password, *params), method)
+        await self._async_post(body.encode(), timeout, method, feed=parser.feed)
+        parser.close()
+
+    async def async_call_many(self, calls, timeout: float | None = None, sequential: bool = False) -> list:
+        """Führt mehrere Aufrufe ``(method, params)`` aus.
+
+        Unterstützt das Gerät ``system.multicall``, geht alles in einem einzigen
+        Request raus, sonst werden die Aufrufe parallel einzeln gesendet; mit
+        ``sequential`` nacheinander in der Reihenfolge von ``calls`` (für
+        Schreibbefehle, deren Reihenfolge zählt, z.B. manual vor value). Die
+        Ergebnisliste hat dieselbe Reihenfolge wie ``calls``; fehlgeschlagene
+        Einzelaufrufe stehen als ``PowerDogApiError`` darin.
+        """
+        if self.multicall_supported is not False:
+            try:
+                results = await self._async_multicall(calls, timeout)
+            except PowerDogApiError as e:
+                # Einmal bestätigt, bleibt es bei multicall: ein Rückfall würde
+                # bereits ausgeführte Befehle erneut senden. Ist das Gerät nicht
+                # erreichbar, sagt der Fehler nichts über die Unterstützung aus.
+                if self.multicall_supported or isinstance(e, PowerDogTransportError):
+                    raise
+                _LOGGER.info(f"ℹ️ system.multicall wird nicht unterstützt, nutze Einzelabfragen ({e})")
+                self.multicall_supported = False
+            else:
+                self.multicall_supported = True
+                return results
+
+        if sequential:
+            results = []
+            for method, params in calls:
+                try:
+                    results.append(await self.async_call(method, *params, timeout=timeout))
+                except PowerDogApiError as e:
+                    results.append(e)
+            return results
+
+        return await asyncio.gather(
+            *(self.async_call(method, *params, timeout=timeout) for method, params in calls),
+            return_exceptions=True,
+        )
+
+    async def _async_multicall(self, calls, timeout: float | None) -> list:
+        """Bündelt die Aufrufe in einem einzigen ``system.multicall``-Request."""
+        batch = [
+            {"methodName": method, "params": [self.password, *params]}
+            for method, params in calls
+        ]
+        body = xmlrpc.client.dumps((batch,), "system.multicall")
+        payload = await self._async_post(body.encode(), timeout, "system.multicall")
+        replies = self._decode(payload, "system.multicall")
+
+        if not isinstance(replies, list) or len(replies) != len(calls):
+            raise PowerDogApiFault("system.multicall: unerwartete Antwortstruktur")
+
+        results = []
+        for (method, _), reply in zip(calls, replies):
+            if isinstance(reply, list) and len(reply) == 1:
+                results.append(reply[0])
+            elif isinstance(reply, dict) and "faultCode" in reply:
+                results.append(PowerDogApiFault(f"{method}: Fault {reply['faultCode']} {reply.get('faultString')}"))
+            else:
+                results.append(PowerDogApiError(f"{method}: ungültige Antwort im Batch"))
+        return results
+
+    async def _async_post(self, body: bytes, timeout: float | None, method: str, feed=None) -> bytes:
+        """Sendet einen XML-RPC-Request und gibt die rohe Antwort zurück.
+
+        Mit ``feed`` wird die Antwort stattdessen stückweise weitergereicht
+        und ``b""`` zurückgegeben.
+        """
+        if not self.breaker.allow_request():
+            raise PowerDogCircuitOpenError(f"{self.url} nicht erreichbar (Circuit Breaker offen)")
+
+        chunks = None
+        if self.recorder is not None and feed is not None:
+            # Gestreamte Antwort für den Mitschnitt zusätzlich sammeln
+            chunks, parser_feed = [], feed
+
+            def feed(chunk):
+                chunks.append(chunk)
+                parser_feed(chunk)
+
+        started = time.monotonic()
+        try:
+            payload, size = await self._async_exchange(body, timeout, method, feed)
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+        except asyncio.TimeoutError as e:
+            self._record_failure(method, started, body, "Timeout")
+            raise PowerDogTransportError(f"Timeout nach {timeout or self.timeout}s") from e
+        except aiohttp.ClientError as e:
+            self._record_failure(method, started, body, str(e))
+            raise PowerDogTransportError(f"Verbindungsfehler: {e}") from e
+        except PowerDogApiError as e:
+            self._record_failure(method, started, body, str(e))
+            raise
+        except Exception as e:
+            # Unerwartete Fehler (z.B. aus dem Parser) zählen ebenfalls als
+            # Fehlschlag, damit ein Probe-Request den Breaker nicht blockiert
+            self._record_failure(method, started, body, str(e))
+            raise PowerDogApiError(f"{method}: unerwarteter Fehler ({e})") from e
+
+        latency = time.monotonic() - started
+        self.breaker.record_success()
+        self.metrics.record_call(method, latency, size)
+        if self.recorder is not None:
+            self.recorder.record(method, body, b"".join(chunks) if chunks is not None else payload, latency)
+        return payload
+
+    async def _async_exchange(self, body: bytes, timeout: float | None, method: str, feed) -> tuple[bytes, int]:
+        """Sendet den Request per HTTP; liefert ``(Antwort, Größe in Bytes)``.
+
+        Mit ``feed`` wird die Antwort stückweise weitergereicht und ``b""``
+        zurückgegeben. Der Replay-Client ersetzt nur diese Methode.
+        """
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        async with self._get_session().post(self.url, data=body, timeout=client_timeout) as resp:
+            if resp.status != 200:
+                raise PowerDogApiError(f"HTTP {resp.status} von {self.url}")
+            if feed is None:
+                payload = await resp.read()
+                return payload, len(payload)
+
+            size = 0
+            async for chunk in resp.content.iter_chunked(STREAM_CHUNK_SIZE):
+                feed(chunk)
+                size += len(chunk)
+            return b"", size
+
+    def _record_failure(self, method: str, started: float, body: bytes, error: str):
+        """Verbucht einen fehlgeschlagenen Request in Breaker, Metriken und Mitschnitt."""
+        latency = time.monotonic() - started
+        self.breaker.record_failure()
+        self.metrics.record_call(method, latency, None)
+        if self.recorder is not None:
+            self.recorder.record(method, body, None, latency, error)
+
+    @staticmethod
+    def _decode(payload: bytes, method: str):
+        """Entpackt eine XML-RPC-Antwort."""
+        try:
+            (result,), _ = xmlrpc.client.loads(payload)
+        except xmlrpc.client.Fault as e:
+            raise PowerDogApiFault(f"{method}: Fault {e.faultCode} {e.faultString}") from e
+        except (xmlrpc.client.Error, ExpatError, ValueError) as e:
+            raise PowerDogApiError(f"{method}: ungültige Antwort ({e})") from e
+        return result
+
+    async def async_close(self):
+        """Schließt alle offenen Verbindungen und schreibt einen laufenden Mitschnitt weg.
+
+        Danach öffnet der Client keine neue Session mehr.
+        """
+        self._closed = True
+        if self.recorder is not None:
+            await self.recorder.async_flush()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
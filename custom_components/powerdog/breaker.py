@@ -0,0 +1,80 @@
+"""Circuit Breaker für die Verbindung zum PowerDog."""
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = 3  # Aufeinanderfolgende Fehler, nach denen der Breaker öffnet
+RESET_TIMEOUT = 30  # Sekunden bis zum ersten Probe-Request
+MAX_RESET_TIMEOUT = 300  # Sekunden; Obergrenze nach wiederholt fehlgeschlagenen Proben
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Lässt Aufrufe sofort scheitern, solange das Gerät nicht antwortet.
+
+    Nach ``failure_threshold`` Fehlern in Folge öffnet der Breaker. Nach
+    ``reset_timeout`` Sekunden darf genau ein Probe-Request durch
+    (half-open): Erfolg schließt den Breaker wieder, ein Fehler öffnet ihn
+    erneut mit verdoppelter Wartezeit.
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT,
+                 max_reset_timeout: float = MAX_RESET_TIMEOUT):
+        """Initialisiere den Breaker im geschlossenen Zustand."""
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """True, wenn ein Aufruf gesendet werden darf (ggf. als Probe)."""
+        if self.state == STATE_CLOSED:
+            return True
+
+        if self.state == STATE_OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = STATE_HALF_OPEN
+            _LOGGER.debug("🔌 PowerDog Circuit Breaker half-open, sende Probe-Request")
+
+        # Half-open: nur ein Probe-Request gleichzeitig
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self):
+        """Meldet einen erfolgreichen Aufruf."""
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("✅ PowerDog wieder erreichbar, Circuit Breaker geschlossen")
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.reset_timeout = self.base_reset_timeout
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        """Meldet einen fehlgeschlagenen Aufruf."""
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN:
+            self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+            self._open()
+        elif self.state == STATE_CLOSED and self.failures >= self.failure_threshold:
+            _LOGGER.warning(f"⚠️ PowerDog antwortet nicht ({self.failures} Fehler), Circuit Breaker geöffnet")
+            self._open()
+
+    def release_probe(self):
+        """Gibt einen abgebrochenen Probe-Request frei, ohne den Zustand zu ändern."""
+        self._probe_in_flight = False
+
+    def _open(self):
+        self.state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
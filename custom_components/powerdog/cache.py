@@ -0,0 +1,62 @@
+"""Persistenter Cache für das PowerDog Geräteinventar."""
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from .const import DOMAIN
+from .model import USAGE_TYPES
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Messwerte im Inventar: werden nicht gecacht, da sie beim nächsten Start längst veraltet sind
+VALUE_FIELDS = ("Current_Value", *USAGE_TYPES)
+
+
+def _without_values(inventory: dict) -> dict:
+    """Inventar ohne Messwerte; die Felder bleiben (mit None) erhalten, damit die Struktur gleich bleibt."""
+    return {
+        entity_id: {field: None if field in VALUE_FIELDS else value for field, value in info.items()}
+        for entity_id, info in inventory.items()
+    }
+
+
+def _to_json(value):
+    """Wandelt XML-RPC-Typen (DateTime, Binary, ...) in JSON-taugliche Werte um."""
+    if isinstance(value, dict):
+        return {str(k): _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class PowerDogDiscoveryCache:
+    """Speichert das zuletzt gefundene Geräteinventar je Config-Entry.
+
+    Beim Start werden die Entitäten sofort aus dem Cache erstellt; die
+    Discovery am Gerät läuft danach im Hintergrund. Messwerte werden nicht
+    gecacht: bis zum ersten Poll haben die Entitäten keinen Wert.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        """Initialisiere den Cache für einen Config-Entry."""
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+
+    async def async_load(self) -> dict | None:
+        """Liefert das gespeicherte Inventar (ohne Messwerte) oder None."""
+        data = await self._store.async_load()
+        if not data or not data.get("inventory"):
+            return None
+        return _without_values(data["inventory"])  # Auch Caches älterer Versionen mit Werten
+
+    async def async_save(self, inventory: dict):
+        """Speichert das Inventar."""
+        await self._store.async_save({"inventory": _to_json(_without_values(inventory))})
+        _LOGGER.debug(f"💾 PowerDog Inventar mit {len(inventory)} Einträgen gespeichert")
+
+    async def async_remove(self):
+        """Löscht den Cache (z.B. wenn der Config-Entry entfernt wird)."""
+        await self._store.async_remove()
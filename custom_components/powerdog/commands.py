@@ -0,0 +1,91 @@
+"""Command-Queue für setRegulationParameter-Aufrufe."""
+import asyncio
+import logging
+
+from .api import PowerDogApiError
+
+_LOGGER = logging.getLogger(__name__)
+
+COMMAND_BATCH_DELAY = 0.05  # Sekunden, in denen Schreibbefehle gesammelt werden
+
+
+class PowerDogCommandQueue:
+    """Sammelt Schreibbefehle eines Hubs, fasst sie zusammen und sendet sie gebündelt.
+
+    - Ein neuer Wert für denselben Key und Parameter ersetzt einen noch nicht
+      gesendeten; nur der letzte geht an das Gerät.
+    - Alle anstehenden Befehle gehen in einem Multicall raus.
+    - Gesendet wird nur unter ``hub.lock``, also nie gleichzeitig mit dem Poll.
+    """
+
+    def __init__(self, hub, delay: float = COMMAND_BATCH_DELAY):
+        """Initialisiere die Queue für einen Hub."""
+        self._hub = hub
+        self._delay = delay
+        # (key, parameter) -> (value, [Futures der Aufrufer])
+        self._pending = {}
+        self._flush_task = None
+
+    async def async_set(self, key, parameters) -> bool:
+        """Reiht ``[(parameter, value), ...]`` für einen Key ein und wartet auf das Ergebnis.
+
+        Die Parameter werden in der angegebenen Reihenfolge gesendet. Liefert
+        True, wenn alle (ggf. durch neuere Werte ersetzten) Befehle erfolgreich waren.
+        """
+        future = asyncio.get_running_loop().create_future()
+        for parameter, value in parameters:
+            # Ersetzter Befehl wandert ans Ende, damit die Reihenfolge des neuesten Aufrufs gilt
+            _, futures = self._pending.pop((key, parameter), (None, []))
+            futures.append(future)
+            self._pending[(key, parameter)] = (str(value), futures)
+
+        if self._flush_task is None:
+            self._flush_task = self._hub.hass.async_create_task(self._async_flush())
+
+        return await future
+
+    def cancel(self):
+        """Verwirft alle noch nicht gesendeten Befehle; wartende Aufrufer erhalten False."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        for _, futures in self._pending.values():
+            for future in futures:
+                if not future.done():
+                    future.set_result(False)
+        self._pending = {}
+
+    async def _async_flush(self):
+        """Sendet alle gesammelten Befehle in einem Batch."""
+        await asyncio.sleep(self._delay)
+
+        async with self._hub.lock:
+            # Ab hier eintreffende Befehle landen im nächsten Batch
+            batch, self._pending = self._pending, {}
+            self._flush_task = None
+            results = {}
+
+            try:
+                calls = [
+                    ("setRegulationParameter", (key, parameter, value))
+                    for (key, parameter), (value, _) in batch.items()
+                ]
+                _LOGGER.debug(f"📤 Sende {len(calls)} Regelparameter an PowerDog")
+                try:
+                    # Ohne Multicall nacheinander senden, damit z.B. manual vor value ankommt
+                    responses = await self._hub.api.async_call_many(calls, sequential=True)
+                except PowerDogApiError as e:
+                    _LOGGER.error(f"❌ PowerDog API-Fehler bei setRegulationParameter: {e}")
+                    responses = [e] * len(calls)
+
+                for ((key, parameter), (value, futures)), response in zip(batch.items(), responses):
+                    success = isinstance(response, dict) and response.get("ErrorCode") == 0
+                    if not success:
+                        _LOGGER.error(f"⚠️ Fehler bei setRegulationParameter({key}, {parameter}, {value}): {response}")
+                    for future in futures:
+                        results[future] = results.get(future, True) and success
+            finally:
+                for _, futures in batch.values():
+                    for future in futures:
+                        if not future.done():
+                            future.set_result(results.get(future, False))
@@ -4,7 +4,28 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.core import callback
-from .const import DOMAIN, CONF_HOST, CONF_PORT, CONF_PASSWORD, CONF_INTERVAL
+from .const import (
+    DOMAIN,
+    CONF_HOST,
+    CONF_PORT,
+    CONF_PASSWORD,
+    CONF_INTERVAL,
+    CONF_DEADBAND_ABSOLUTE,
+    CONF_DEADBAND_RELATIVE,
+    CONF_DEADBANDS,
+    CONF_ADAPTIVE_POLLING,
+    CONF_FAST_SAMPLING_INTERVAL,
+    CONF_RECORD_TRAFFIC,
+    CONF_NUMBER_SETTLE_TIME,
+    DEFAULT_NUMBER_SETTLE_TIME,
+    CONF_SLOW_POLL_INTERVAL,
+    CONF_SLOW_POLL_KEYS,
+    DEFAULT_SLOW_POLL_KEYS,
+    CONF_IMPORT_STATISTICS,
+    CONF_DERIVED_SENSORS,
+)
+from .deadband import parse_deadbands
+from .derived import parse_derived
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -22,7 +43,8 @@ DATA_SCHEMA = vol.Schema(
 class PowerDogConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle die Konfigurations-UI für PowerDog."""
 
-    VERSION = 1
+    # 2: Unique-IDs der Entitäten enthalten die Entry-ID (siehe async_migrate_entry)
+    VERSION = 2
 
     async def async_step_user(self, user_input=None):
         """Erster Schritt der Konfiguration."""
@@ -49,11 +71,21 @@ class PowerDogOptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Zeige die Optionen an und erlaube Änderungen."""
+        errors = {}
         if user_input is not None:
-            _LOGGER.debug(f"🔄 Neue PowerDog-Konfiguration: {user_input}")
-
-            # Erstelle den neuen Eintrag mit den aktualisierten Werten
-            return self.async_create_entry(title="", data=user_input)
+            try:
+                parse_deadbands(user_input.get(CONF_DEADBANDS, ""))
+            except ValueError:
+                errors[CONF_DEADBANDS] = "invalid_deadband"
+            try:
+                parse_derived(user_input.get(CONF_DERIVED_SENSORS, ""))
+            except ValueError:
+                errors[CONF_DERIVED_SENSORS] = "invalid_derived"
+            if not errors:
+                _LOGGER.debug(f"🔄 Neue PowerDog-Konfiguration: {user_input}")
+
+                # Erstelle den neuen Eintrag mit den aktualisierten Werten
+                return self.async_create_entry(title="", data=user_input)
 
         # Aktuelle Werte abrufen
         current_options = self.entry.options if self.entry.options else self.entry.data
@@ -65,7 +97,39 @@ class PowerDogOptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Optional(CONF_PORT, default=current_options.get(CONF_PORT, 20000)): int,
                 vol.Required(CONF_PASSWORD, default=current_options.get(CONF_PASSWORD, "")): str,
                 vol.Optional(CONF_INTERVAL, default=current_options.get(CONF_INTERVAL, 30)): int,
+                vol.Optional(
+                    CONF_DEADBAND_ABSOLUTE, default=current_options.get(CONF_DEADBAND_ABSOLUTE, 0.0)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_DEADBAND_RELATIVE, default=current_options.get(CONF_DEADBAND_RELATIVE, 0.0)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+                vol.Optional(CONF_DEADBANDS, default=current_options.get(CONF_DEADBANDS, "")): str,
+                vol.Optional(
+                    CONF_ADAPTIVE_POLLING, default=current_options.get(CONF_ADAPTIVE_POLLING, False)
+                ): bool,
+                vol.Optional(
+                    CONF_FAST_SAMPLING_INTERVAL, default=current_options.get(CONF_FAST_SAMPLING_INTERVAL, 0.0)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_RECORD_TRAFFIC, default=current_options.get(CONF_RECORD_TRAFFIC, False)
+                ): bool,
+                vol.Optional(
+                    CONF_NUMBER_SETTLE_TIME,
+                    default=current_options.get(CONF_NUMBER_SETTLE_TIME, DEFAULT_NUMBER_SETTLE_TIME),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_SLOW_POLL_INTERVAL, default=current_options.get(CONF_SLOW_POLL_INTERVAL, 0)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_SLOW_POLL_KEYS, default=current_options.get(CONF_SLOW_POLL_KEYS, DEFAULT_SLOW_POLL_KEYS)
+                ): str,
+                vol.Optional(
+                    CONF_IMPORT_STATISTICS, default=current_options.get(CONF_IMPORT_STATISTICS, False)
+                ): bool,
+                vol.Optional(
+                    CONF_DERIVED_SENSORS, default=current_options.get(CONF_DERIVED_SENSORS, "")
+                ): str,
             }
         )
 
-        return self.async_show_form(step_id="init", data_schema=data_schema)
+        return self.async_show_form(step_id="init", data_schema=data_schema, errors=errors)
@@ -8,3 +8,42 @@ CONF_PASSWORD = "password"
 CONF_INTERVAL = "interval"
 
 PLATFORMS = ["sensor", "switch", "number"]
+
+# Deadband: Sensorwerte, die sich weniger als diese Schwelle ändern, erzeugen keinen neuen State
+CONF_DEADBAND_ABSOLUTE = "deadband_absolute"
+CONF_DEADBAND_RELATIVE = "deadband_relative"  # in Prozent
+CONF_DEADBANDS = "deadbands"  # Pro-Sensor-Ausnahmen, z.B. "key1=5, key2=2%"
+
+# Adaptives Polling: schneller bei vielen Änderungen, langsamer bei stabilen Werten
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+
+# Schnelles Sampling in Sekunden (0 = aus); veröffentlicht wird weiter im normalen Intervall
+CONF_FAST_SAMPLING_INTERVAL = "fast_sampling_interval"
+
+# Mitschnitt des XML-RPC-Verkehrs nach <config>/powerdog_<host>_<Zeit>.jsonl.gz
+CONF_RECORD_TRAFFIC = "record_traffic"
+
+# Number-Entitäten: Wartezeit nach der letzten Änderung, bevor der Wert gesendet wird (Sekunden)
+CONF_NUMBER_SETTLE_TIME = "number_settle_time"
+DEFAULT_NUMBER_SETTLE_TIME = 0.5
+
+# Poll-Stufen: LinearTypes bzw. Key-Muster, die nur alle ``slow_poll_interval`` Sekunden
+# verarbeitet werden (0 = aus); alle anderen Werte bei jedem Poll
+CONF_SLOW_POLL_INTERVAL = "slow_poll_interval"
+CONF_SLOW_POLL_KEYS = "slow_poll_keys"
+DEFAULT_SLOW_POLL_KEYS = "counter, usage"
+
+# Stündlicher Import der Counter-Stände als externe Langzeitstatistik (powerdog:<entry>_<key>)
+CONF_IMPORT_STATISTICS = "import_statistics"
+
+# Vom Hub berechnete Sensoren, z.B. "Eigenverbrauch = pv - einspeisung" (siehe derived.py)
+CONF_DERIVED_SENSORS = "derived_sensors"
+
+# Wie oft das Geräteinventar im Betrieb neu abgeglichen wird (Sekunden)
+REDISCOVERY_INTERVAL = 3600
+
+# Dispatcher-Signal, über das der Hub einer Plattform neue Keys meldet
+SIGNAL_NEW_ENTITIES = "powerdog_new_entities_{entry_id}_{platform}"
+
+# Wie viele Intervalle der letzte gültige Snapshot alt sein darf, bevor Entitäten unavailable werden
+SNAPSHOT_MAX_AGE_INTERVALS = 3
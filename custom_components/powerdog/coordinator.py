@@ -0,0 +1,112 @@
+"""Update-Coordinator für die PowerDog Integration."""
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PowerDogCoordinator(DataUpdateCoordinator):
+    """Fragt getAllCurrentLinearValues einmal pro Intervall ab und verteilt die Werte.
+
+    Die Entitäten pollen nicht selbst, sondern registrieren sich mit ihrem
+    Key als Kontext. Nach einer Abfrage werden nur die Entitäten
+    benachrichtigt, deren Wert sich geändert hat; bei einem Wechsel der
+    Verfügbarkeit alle.
+    """
+
+    def __init__(self, hass: HomeAssistant, hub):
+        """Initialisiere den Coordinator für einen Hub.
+
+        Ein eigenes Intervall hat der Coordinator nicht; die Abfragen löst
+        der ``PowerDogPollScheduler`` aus.
+        """
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=None,
+        )
+        self.hub = hub
+        self._key_listeners = {}
+        # Bis zum ersten gültigen Poll sind die Entitäten nicht verfügbar → danach alle neu schreiben
+        self._was_available = False
+        self._unsub_expiry = None
+
+    @callback
+    def async_add_listener(self, update_callback, context=None):
+        """Registriert einen Listener und indiziert ihn zusätzlich nach Key."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        self._key_listeners.setdefault(context, []).append(update_callback)
+
+        @callback
+        def remove_key_listener():
+            remove_listener()
+            listeners = self._key_listeners.get(context, [])
+            if update_callback in listeners:
+                listeners.remove(update_callback)
+            if not listeners:
+                self._key_listeners.pop(context, None)
+
+        return remove_key_listener
+
+    @callback
+    def async_update_listeners(self):
+        """Benachrichtigt nur die Listener der geänderten Keys."""
+        if not self.last_update_success or not self._was_available or not isinstance(self.data, set):
+            # Verfügbarkeit hat sich geändert → alle Entitäten neu schreiben
+            self._was_available = self.last_update_success
+            super().async_update_listeners()
+            self.hub.metrics.record_fanout(len(self._listeners))
+            return
+
+        updated = 0
+        for key in (None, *self.data):
+            for update_callback in list(self._key_listeners.get(key, ())):
+                update_callback()
+                updated += 1
+        self.hub.metrics.record_fanout(updated)
+
+    @callback
+    def async_update_key_listeners(self, keys):
+        """Benachrichtigt nur die Listener der angegebenen Keys (z.B. nach einer Rückmeldung)."""
+        for key in keys:
+            for update_callback in list(self._key_listeners.get(key, ())):
+                update_callback()
+
+    async def _async_update_data(self):
+        """Holt die aktuellen Werte; liefert die Menge der geänderten Keys."""
+        _LOGGER.debug("🔄 PowerDog Update wurde getriggert.")
+        updated = await self.hub.async_update_values()
+        if updated is None:
+            self._async_schedule_expiry()
+            raise UpdateFailed("Keine aktuellen Werte von PowerDog erhalten")
+
+        self.async_cancel_expiry()
+        return updated
+
+    @callback
+    def async_cancel_expiry(self):
+        """Bricht eine geplante Snapshot-Ablaufmeldung ab (beim Entladen)."""
+        if self._unsub_expiry is not None:
+            self._unsub_expiry()
+            self._unsub_expiry = None
+
+    @callback
+    def _async_schedule_expiry(self):
+        """Plant die Benachrichtigung, sobald der letzte gültige Snapshot veraltet ist."""
+        if self._unsub_expiry is not None or self.hub.last_good_update is None:
+            return
+        expires_in = (self.hub.last_good_update + self.hub.snapshot_max_age - dt_util.utcnow()).total_seconds()
+        self._unsub_expiry = async_call_later(self.hass, max(0, expires_in), self._async_handle_expiry)
+
+    @callback
+    def _async_handle_expiry(self, _now):
+        """Snapshot ist veraltet → alle Entitäten melden sich unavailable."""
+        self._unsub_expiry = None
+        _LOGGER.debug("⌛ Letzter gültiger PowerDog Snapshot ist veraltet")
+        DataUpdateCoordinator.async_update_listeners(self)
@@ -0,0 +1,69 @@
+"""Deadband-Filter für PowerDog Sensorwerte."""
+from .const import CONF_DEADBAND_ABSOLUTE, CONF_DEADBAND_RELATIVE, CONF_DEADBANDS
+
+
+def parse_deadbands(text: str) -> dict:
+    """Liest Pro-Sensor-Deadbands aus einem Text wie ``"key1=5, key2=2%"``.
+
+    Werte mit ``%`` sind relativ zum letzten Wert, alle anderen absolut.
+    Derselbe Key darf zweimal vorkommen, um beide Schwellen zu setzen.
+    Liefert ``{key: (absolut, relativ)}``; wirft ValueError bei ungültiger Eingabe.
+    """
+    deadbands = {}
+    for part in (text or "").replace("\n", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+
+        key, sep, value = part.partition("=")
+        key, value = key.strip(), value.strip()
+        if not sep or not key or not value:
+            raise ValueError(f"Ungültige Deadband-Angabe: {part}")
+
+        absolute, relative = deadbands.get(key, (0.0, 0.0))
+        if value.endswith("%"):
+            relative = float(value[:-1]) / 100
+        else:
+            absolute = float(value)
+        if absolute < 0 or relative < 0:
+            raise ValueError(f"Deadband darf nicht negativ sein: {part}")
+        deadbands[key] = (absolute, relative)
+    return deadbands
+
+
+class DeadbandFilter:
+    """Entscheidet, ob sich ein neuer Sensorwert genug vom zuletzt geschriebenen unterscheidet."""
+
+    def __init__(self, absolute: float = 0.0, relative: float = 0.0, overrides: dict | None = None):
+        """Initialisiere den Filter; ``relative`` ist ein Anteil (0.02 = 2 %)."""
+        self.default = (absolute, relative)
+        self.overrides = overrides or {}
+
+    @classmethod
+    def from_options(cls, options) -> "DeadbandFilter":
+        """Erstellt den Filter aus den Optionen des Config-Entries."""
+        return cls(
+            float(options.get(CONF_DEADBAND_ABSOLUTE, 0) or 0),
+            float(options.get(CONF_DEADBAND_RELATIVE, 0) or 0) / 100,
+            parse_deadbands(options.get(CONF_DEADBANDS, "")),
+        )
+
+    def is_significant(self, key, new, last) -> bool:
+        """True, wenn ``new`` gegenüber ``last`` eine neue Zustandsmeldung rechtfertigt."""
+        if new == last:
+            return False
+
+        absolute, relative = self.overrides.get(key, self.default)
+        if not absolute and not relative:
+            return True
+
+        try:
+            delta = abs(float(new) - float(last))
+        except (TypeError, ValueError):
+            return True  # Nicht-numerische Werte immer melden
+
+        if absolute and delta < absolute:
+            return False
+        if relative and delta < relative * abs(float(last)):
+            return False
+        return True
@@ -0,0 +1,182 @@
+"""Abgeleitete Sensoren: Summen, Differenzen und Verhältnisse über PowerDog Keys."""
+import fnmatch
+import logging
+import re
+
+from .const import CONF_DERIVED_SENSORS
+from .model import DERIVED_LINEAR_TYPE, ENERGY_UNITS, USAGE_LINEAR_TYPE, PowerDogValue
+
+_LOGGER = logging.getLogger(__name__)
+
+DERIVED_PREFIX = "derived_"
+
+
+class DerivedDefinition:
+    """Ein abgeleiteter Sensor: ``Zähler`` bzw. ``Zähler / Nenner``, je eine Liste ``(Vorzeichen, Key)``."""
+
+    __slots__ = ("name", "key", "numerator", "denominator")
+
+    def __init__(self, name: str, numerator: tuple, denominator: tuple | None = None):
+        """Initialisiere die Definition."""
+        self.name = name
+        self.key = DERIVED_PREFIX + re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+        self.numerator = numerator
+        self.denominator = denominator
+
+
+def _parse_terms(text: str, line: str) -> tuple:
+    """Liest ``a + b - c`` (Operatoren durch Leerzeichen getrennt, Keys dürfen ``*``/``?`` enthalten)."""
+    text = text.strip()
+    if text.startswith("(") and text.endswith(")"):
+        text = text[1:-1]
+    tokens = text.split()
+    if tokens and tokens[0] in "+-":
+        tokens.insert(0, "0")  # Führendes Vorzeichen → wie "0 - a"
+    terms, sign = [], 1
+    for index, token in enumerate(tokens):
+        if index % 2:
+            if token not in ("+", "-"):
+                raise ValueError(f"Operator erwartet (+, - mit Leerzeichen): {line}")
+            sign = 1 if token == "+" else -1
+        elif token != "0":
+            if token in ("+", "-"):
+                raise ValueError(f"Key erwartet: {line}")
+            terms.append((sign, token))
+    if not terms or len(tokens) % 2 == 0:
+        raise ValueError(f"Unvollständiger Ausdruck: {line}")
+    return tuple(terms)
+
+
+def parse_derived(text: str) -> list:
+    """Liest Definitionen wie ``"Eigenverbrauch = pv - einspeisung; Autarkie = (pv - einspeisung) / last"``.
+
+    Je Zeile (bzw. durch ``;`` getrennt) ein Name, ``=`` und eine Summe bzw.
+    Differenz von Keys, optional geteilt durch eine zweite (Verhältnis in %).
+    Keys mit ``*``/``?`` stehen für alle passenden Geräte-Keys. Wirft
+    ValueError bei ungültiger Eingabe.
+    """
+    definitions, keys = [], set()
+    for line in (text or "").replace("\n", ";").split(";"):
+        line = line.strip()
+        if not line:
+            continue
+
+        name, sep, expression = line.partition("=")
+        name = name.strip()
+        if not sep or not name or not expression.strip():
+            raise ValueError(f"Ungültige Definition (Name = Ausdruck): {line}")
+
+        numerator, slash, denominator = expression.partition("/")
+        definition = DerivedDefinition(
+            name,
+            _parse_terms(numerator, line),
+            _parse_terms(denominator, line) if slash else None,
+        )
+        if definition.key == DERIVED_PREFIX or definition.key in keys:
+            raise ValueError(f"Name ungültig oder doppelt: {name}")
+        keys.add(definition.key)
+        definitions.append(definition)
+    return definitions
+
+
+class PowerDogDerived:
+    """Berechnet alle abgeleiteten Sensoren eines Hubs in einem Durchlauf.
+
+    ``bind`` löst die Keys und Muster gegen das Inventar auf und legt eine
+    flache Koeffiziententabelle ``(Datensatz, Faktor, Slot)`` an; ``compute``
+    summiert sie in einem Durchlauf in die Slots (Zähler und Nenner je
+    Definition) und liefert daraus die Werte.
+    """
+
+    def __init__(self, text: str = ""):
+        """Initialisiere die Definitionen aus dem Optionstext."""
+        self.text = text or ""
+        self.definitions = parse_derived(self.text)
+        self.records = {}  # Key → PowerDogValue der abgeleiteten Sensoren
+        self.increasing = frozenset()  # Keys, die nur aus positiven Energiezählern bestehen
+        self._terms = ()
+        self._outputs = ()
+        self._missing = frozenset()  # Slots mit einem Key oder Muster ohne Treffer
+
+    @classmethod
+    def from_options(cls, options) -> "PowerDogDerived":
+        """Erstellt die abgeleiteten Sensoren aus den Optionen des Config-Entries."""
+        return cls(options.get(CONF_DERIVED_SENSORS, ""))
+
+    def bind(self, values: dict, reuse) -> dict:
+        """Löst die Definitionen gegen ``values`` auf; liefert Key → Quell-Keys.
+
+        ``reuse`` übernimmt bekannte Datensätze, damit Wert und Meldestatus erhalten bleiben.
+        """
+        devices = [
+            key for key, record in values.items()
+            if record.linear_type not in (USAGE_LINEAR_TYPE, DERIVED_LINEAR_TYPE)
+        ]
+        terms, outputs, records, sources = [], [], {}, {}
+        increasing, negative = set(), set()  # negative: Slots mit mindestens einem Minus-Term
+        missing = set()
+
+        def expand(name, side, slot):
+            """Hängt die Terme einer Seite an die Tabelle an; liefert die Datensätze."""
+            used = []
+            for sign, pattern in side:
+                if sign < 0:
+                    negative.add(slot)
+                matches = fnmatch.filter(devices, pattern) if any(c in pattern for c in "*?[") else [pattern]
+                found = False
+                for key in matches:
+                    record = values.get(key)
+                    if record is not None and record.linear_type != DERIVED_LINEAR_TYPE:
+                        terms.append((record, float(sign), slot))
+                        used.append(record)
+                        found = True
+                if not found:
+                    # Fehlende Quelle wie einen fehlenden Wert behandeln statt sie als 0 zu zählen
+                    missing.add(slot)
+                    _LOGGER.warning(f"⚠️ Abgeleiteter Sensor {name}: {pattern} passt zu keinem PowerDog Key")
+            return used
+
+        for index, definition in enumerate(self.definitions):
+            used = expand(definition.name, definition.numerator, 2 * index)
+            if definition.denominator is not None:
+                used += expand(definition.name, definition.denominator, 2 * index + 1)
+                unit = "%"
+            else:
+                units = {record.unit for record in used}
+                unit = units.pop() if len(units) == 1 else ""
+
+            record = reuse(PowerDogValue(definition.key, definition.name, unit, linear_type=DERIVED_LINEAR_TYPE))
+            record.filtered = True
+            records[definition.key] = record
+            outputs.append((record, definition.denominator is not None))
+            sources[definition.key] = tuple(dict.fromkeys(source.key for source in used))
+            # Nur eine reine Summe von Energiezählern steigt sicher monoton
+            if (definition.denominator is None and used and 2 * index not in negative
+                    and all(source.unit in ENERGY_UNITS for source in used)):
+                increasing.add(definition.key)
+
+        self.records = records
+        self._terms = tuple(terms)
+        self._outputs = tuple(outputs)
+        self._missing = frozenset(missing)
+        self.increasing = frozenset(increasing)
+        return sources
+
+    def compute(self):
+        """Liefert ``(Datensatz, Wert)`` je abgeleitetem Sensor; None, wenn ein Quellwert fehlt."""
+        slots = [0.0] * (2 * len(self._outputs))
+        invalid = set(self._missing)
+        for record, factor, slot in self._terms:
+            try:
+                slots[slot] += factor * float(record.value)
+            except (TypeError, ValueError):
+                invalid.add(slot)
+
+        for index, (record, ratio) in enumerate(self._outputs):
+            numerator, denominator = 2 * index, 2 * index + 1
+            if numerator in invalid or (ratio and (denominator in invalid or not slots[denominator])):
+                yield record, None
+            elif ratio:
+                yield record, round(slots[numerator] / slots[denominator] * 100, 2)
+            else:
+                yield record, round(slots[numerator], 3)
@@ -0,0 +1,53 @@
+"""Diagnostics für die PowerDog Integration."""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from .const import DOMAIN, CONF_PASSWORD
+
+TO_REDACT = {CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Liefert Konfiguration, Zustand und Laufzeitmetriken des Hubs."""
+    hub = hass.data[DOMAIN][entry.entry_id]["hub"]
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    scheduler = hass.data[DOMAIN].get("scheduler")
+    target = scheduler.targets.get(coordinator) if scheduler else None
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "hub": {
+            "interval": hub.interval,
+            "sensors": len(hub.sensors),
+            "switches": len(hub.switches),
+            "selects": len(hub.selects),
+            "numbers": len(hub.numbers),
+            "derived": len(hub.derived.records),
+            "last_value_count": hub.last_value_count,
+            "last_good_update": hub.last_good_update.isoformat() if hub.last_good_update else None,
+            "multicall_supported": hub.api.multicall_supported,
+            "circuit_breaker": hub.api.breaker.state,
+            "fast_sampling": {
+                "interval": hub.sampler.interval,
+                "ring_size": hub.sampler.size,
+                "rings": len(hub.sampler.rings),
+            } if hub.sampler else None,
+            "tiers": {
+                "slow_interval": hub.tiers.slow_interval,
+                "slow_keys": hub.tiers.slow_keys,
+                "active_keys": len(hub.active_routes),
+                "fast_keys": len(hub.fast_routes),
+            } if hub.tiers.enabled else None,
+        },
+        "scheduler": {
+            "interval": target.interval,
+            "adaptive": target.adaptive,
+            "failures": target.failures,
+            "hubs": len(scheduler.targets),
+            "max_concurrent": scheduler.max_concurrent,
+        } if target else None,
+        "metrics": hub.metrics.as_dict(),
+    }
@@ -0,0 +1,174 @@
+"""Stündlicher Import der PowerDog Zählerstände als Langzeitstatistik."""
+import logging
+from datetime import datetime, timedelta
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics, get_last_statistics
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import DOMAIN
+from .model import usage_key
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+IMPORT_SECOND = 30  # Sekunden nach der vollen Stunde; bis dahin liegt ein Poll der neuen Stunde vor
+MAX_BACKFILL_HOURS = 24 * 7  # Längste Lücke, die nachträglich aufgefüllt wird
+# Kumulativer Zählerstand eines Counters (Current_Value ist die momentane Leistung);
+# setzt zum Jahreswechsel zurück, was ``_rows`` wie einen Zählertausch behandelt
+READING_TYPE = "Year_Usage"
+
+
+class PowerDogEnergyStatistics:
+    """Schreibt die Stände der Counter eines Hubs stündlich als externe Statistik.
+
+    Je Counter entsteht aus seinem ``Year_Usage``-Sensor die Statistik
+    ``powerdog:<entry>_<key>_year_usage`` mit ``state`` (Zählerstand) und
+    ``sum`` (seit Beginn gezählte Energie), in derselben Einheit wie der
+    Sensor. Diese Werte werden auch ohne aktive Entität abgefragt. Fehlen Stunden,
+    z.B. nach einem Neustart oder während das Gerät offline war, werden sie
+    zwischen dem letzten importierten und dem aktuellen Zählerstand linear
+    aufgefüllt. Alle Stunden eines Counters gehen in einem Import an den
+    Recorder; es entstehen keine State-Zeilen.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, hub):
+        """Initialisiere den Import für einen Hub."""
+        self.hass = hass
+        self.hub = hub
+        self._entry_id = entry_id
+        self._last = {}  # Statistik-ID → (Beginn, state, sum) der zuletzt importierten Stunde
+        self._loaded = set()  # Statistik-IDs, deren letzter Stand aus dem Recorder geladen ist
+        self._enabled = set()  # Beim Hub angemeldete Keys der Zählerstände
+
+    @callback
+    def async_start(self):
+        """Startet den stündlichen Import; liefert die Funktion zum Stoppen."""
+        self._async_enable_readings()
+        unsub = async_track_utc_time_change(self.hass, self._async_hourly, minute=0, second=IMPORT_SECOND)
+
+        @callback
+        def async_stop():
+            unsub()
+            for key in self._enabled:
+                self.hub.disable_key(key)
+            self._enabled = set()
+
+        return async_stop
+
+    def readings(self) -> list:
+        """Zählerstand-Datensätze aller Counter des aktuellen Inventars."""
+        readings = []
+        for record in list(self.hub.sensors.values()):
+            if record.linear_type != "counter":
+                continue
+            reading = self.hub.values.get(usage_key(record.key, READING_TYPE))
+            if reading is not None:
+                readings.append(reading)
+        return readings
+
+    @callback
+    def _async_enable_readings(self):
+        """Hält die Zählerstände im Poll, auch wenn ihre Usage-Sensoren deaktiviert sind."""
+        keys = {record.key for record in self.readings()}
+        for key in keys - self._enabled:
+            self.hub.enable_key(key)
+        for key in self._enabled - keys:
+            self.hub.disable_key(key)
+        self._enabled = keys
+
+    def statistic_id(self, key: str) -> str:
+        """ID der externen Statistik eines Counters."""
+        return f"{DOMAIN}:{slugify(f'{self._entry_id}_{key}')}"
+
+    @callback
+    def _async_hourly(self, now: datetime):
+        """Importiert die gerade abgeschlossene Stunde (im Hintergrund)."""
+        self.hass.async_create_background_task(self.async_import(now), f"{DOMAIN}_energy_statistics")
+
+    async def async_import(self, now: datetime):
+        """Importiert alle Counter bis zur Stunde vor ``now``."""
+        # Nach einer Rediscovery neue Counter anmelden; ihr erster Stand folgt mit dem nächsten Poll
+        self._async_enable_readings()
+        if not self.hub.snapshot_fresh:
+            _LOGGER.debug("📉 PowerDog Statistik-Import übersprungen, keine aktuellen Zählerstände")
+            return
+
+        hour = dt_util.as_utc(now).replace(minute=0, second=0, microsecond=0) - HOUR
+        imported = 0
+        for record in self.readings():
+            try:
+                reading = float(record.value)
+            except (TypeError, ValueError):
+                continue
+
+            statistic_id = self.statistic_id(record.key)
+            if statistic_id not in self._loaded:
+                await self._async_load_last(statistic_id)
+
+            rows = self._rows(statistic_id, hour, reading)
+            if not rows:
+                continue
+            async_add_external_statistics(
+                self.hass,
+                StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=f"PowerDog {record.name}",
+                    source=DOMAIN,
+                    statistic_id=statistic_id,
+                    unit_of_measurement=record.unit,
+                ),
+                rows,
+            )
+            imported += len(rows)
+
+        _LOGGER.debug(f"📈 PowerDog Statistik: {imported} Stundenwerte importiert")
+
+    async def _async_load_last(self, statistic_id: str):
+        """Lädt die zuletzt importierte Stunde aus dem Recorder (einmal je Statistik)."""
+        last = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics, self.hass, 1, statistic_id, True, {"state", "sum"}
+        )
+        self._loaded.add(statistic_id)
+        rows = last.get(statistic_id)
+        if rows:
+            row = rows[0]
+            start = row["start"]
+            if not isinstance(start, datetime):
+                start = dt_util.utc_from_timestamp(start)
+            self._last[statistic_id] = (start, row["state"], row["sum"] or 0.0)
+
+    def _rows(self, statistic_id: str, hour: datetime, reading: float) -> list:
+        """Stundenwerte von der letzten importierten Stunde bis ``hour`` (inklusive)."""
+        last = self._last.get(statistic_id)
+        if last is None:
+            rows = [StatisticData(start=hour, state=reading, sum=0.0)]
+            self._last[statistic_id] = (hour, reading, 0.0)
+            return rows
+
+        last_start, last_state, last_sum = last
+        hours = int((hour - last_start) / HOUR)
+        if hours <= 0:
+            return []  # Stunde bereits importiert
+
+        delta = reading - last_state
+        if delta < 0:
+            # Zähler wurde zurückgesetzt → der neue Stand ist die seitdem gezählte Energie
+            rows = [StatisticData(start=hour, state=reading, sum=last_sum + reading)]
+        else:
+            first = max(1, hours - MAX_BACKFILL_HOURS + 1)
+            rows = [
+                StatisticData(
+                    start=last_start + step * HOUR,
+                    state=last_state + delta * step / hours,
+                    sum=last_sum + delta * step / hours,
+                )
+                for step in range(first, hours + 1)
+            ]
+        self._last[statistic_id] = (hour, rows[-1]["state"], rows[-1]["sum"])
+        return rows
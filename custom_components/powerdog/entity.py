@@ -0,0 +1,191 @@
+"""Gemeinsame Basisklasse für PowerDog Entitäten."""
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from .const import DOMAIN, SIGNAL_NEW_ENTITIES
+
+_LOGGER = logging.getLogger(__name__)
+
+# Format der Unique-ID je Plattform (Entry-ID und Key → Unique-ID)
+UNIQUE_ID_FORMATS = {
+    "sensor": "powerdog_{entry_id}_{key}",
+    "switch": "powerdog_switch_{entry_id}_{key}",
+    "select": "powerdog_{entry_id}_{key}",
+    "number": "powerdog_number_{entry_id}_{key}",
+}
+
+# Diagnose-Sensoren (Key der Metrik); eigenes Präfix, damit kein Geräte-Key kollidiert
+DIAGNOSTIC_UNIQUE_ID_FORMAT = "powerdog_diag_{entry_id}_{key}"
+
+# Formate bis Config-Entry-Version 1: ohne Entry-ID, kollidierten bei mehreren PowerDogs
+LEGACY_UNIQUE_ID_FORMATS = {
+    "sensor": "powerdog_{key}",
+    "switch": "powerdog_switch_{key}",
+    "select": "powerdog_{key}",
+    "number": "powerdog_number_{key}",
+}
+LEGACY_DIAGNOSTIC_UNIQUE_ID_FORMAT = "powerdog_{entry_id}_{key}"
+
+
+def unique_id_for(platform: str, entry_id: str, key: str) -> str:
+    """Unique-ID der Entität einer Plattform für ``key`` im Config-Entry ``entry_id``."""
+    return UNIQUE_ID_FORMATS[platform].format(entry_id=entry_id, key=key)
+
+
+def diagnostic_unique_id(entry_id: str, key: str) -> str:
+    """Unique-ID eines Diagnose-Sensors im Config-Entry ``entry_id``."""
+    return DIAGNOSTIC_UNIQUE_ID_FORMAT.format(entry_id=entry_id, key=key)
+
+
+def _key_from(unique_id_format: str, unique_id: str, entry_id: str | None = None) -> str | None:
+    """Key aus ``unique_id``, falls sie zum Format passt."""
+    prefix = unique_id_format.partition("{key}")[0].format(entry_id=entry_id)
+    if not prefix or not unique_id.startswith(prefix):
+        return None
+    return unique_id[len(prefix):]
+
+
+def key_from_unique_id(platform: str, entry_id: str, unique_id: str) -> str | None:
+    """Key zur Unique-ID einer Entität der Plattform (Umkehrung von ``unique_id_for``)."""
+    if platform not in UNIQUE_ID_FORMATS:
+        return None
+    return _key_from(UNIQUE_ID_FORMATS[platform], unique_id, entry_id)
+
+
+def migrate_unique_id(platform: str, entry_id: str, unique_id: str) -> str | None:
+    """Neue Unique-ID für eine aus Config-Entry-Version 1; None, wenn nichts zu tun ist."""
+    if platform not in UNIQUE_ID_FORMATS or _key_from(DIAGNOSTIC_UNIQUE_ID_FORMAT, unique_id, entry_id):
+        return None  # fremde Plattform oder schon migriert
+    if platform == "sensor":
+        # In Version 1 hatten nur die Diagnose-Sensoren die Entry-ID in der Unique-ID
+        key = _key_from(LEGACY_DIAGNOSTIC_UNIQUE_ID_FORMAT, unique_id, entry_id)
+        if key:
+            return diagnostic_unique_id(entry_id, key)
+    elif key_from_unique_id(platform, entry_id, unique_id) is not None:
+        return None
+    key = _key_from(LEGACY_UNIQUE_ID_FORMATS[platform], unique_id)
+    return unique_id_for(platform, entry_id, key) if key else None
+
+
+def device_info(entry, hub) -> DeviceInfo:
+    """Geräteeintrag des Config-Entries; der Host im Namen unterscheidet mehrere PowerDogs."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, str(entry.entry_id))},
+        name=f"PowerDog {hub.host}",
+        manufacturer="PowerDog",
+        model="API"
+    )
+
+
+@callback
+def async_registry_disabled(hass: HomeAssistant, platform: str, entry_id: str, key: str) -> bool:
+    """True, wenn die Entität für ``key`` in der Entity-Registry deaktiviert ist.
+
+    Solche Entitäten legen die Plattformen gar nicht erst an; wird eine
+    wieder aktiviert, lädt Home Assistant den Config-Entry neu.
+    """
+    registry = er.async_get(hass)
+    entity_id = registry.async_get_entity_id(platform, DOMAIN, unique_id_for(platform, entry_id, key))
+    return entity_id is not None and registry.async_get(entity_id).disabled
+
+
+@callback
+def async_setup_key_entities(hass: HomeAssistant, entry, platform: str, create, async_add_entities) -> list:
+    """Legt je Key der Plattform eine Entität an und ergänzt später gefundene Keys.
+
+    ``create(key, record)`` erzeugt die Entität. Neue Keys meldet die
+    Rediscovery über ``SIGNAL_NEW_ENTITIES``. Liefert die beim Setup
+    angelegten Entitäten.
+    """
+    hub = hass.data[DOMAIN][entry.entry_id]["hub"]
+
+    @callback
+    def async_add_keys(keys):
+        records = hub.platform_records(platform)
+        entities = [
+            create(key, records[key])
+            for key in keys
+            if key in records and not async_registry_disabled(hass, platform, entry.entry_id, key)
+        ]
+        if entities:
+            # Eigene Liste an Home Assistant übergeben: das Hinzufügen läuft verzögert
+            async_add_entities(list(entities))
+        return entities
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_NEW_ENTITIES.format(entry_id=entry.entry_id, platform=platform), async_add_keys
+        )
+    )
+    return async_add_keys(list(hub.platform_records(platform)))
+
+
+class PowerDogEntity(CoordinatorEntity):
+    """Basis für alle PowerDog Entitäten.
+
+    Schlägt ein Poll fehl, bleiben die Entitäten mit dem letzten gültigen
+    Wert verfügbar und melden ``stale``, bis der Snapshot des Hubs zu alt ist.
+
+    Entitäten mit Key melden sich beim Hub an, solange sie in Home Assistant
+    aktiv sind; nur diese Keys werden bei jedem Poll verarbeitet.
+    """
+
+    async def async_added_to_hass(self):
+        """Registriert den Listener und meldet den Key beim Hub an."""
+        await super().async_added_to_hass()
+        key = self.coordinator_context
+        if key is None:
+            return
+
+        hub = self.coordinator.hub
+        hub.enable_key(key)
+        self.async_on_remove(lambda: hub.disable_key(key))
+
+    @callback
+    def _async_schedule_confirm(self):
+        """Startet nach einem erfolgreichen Befehl die gezielte Rückmeldung vom Gerät."""
+        self.hass.async_create_task(self._async_confirm())
+
+    async def _async_confirm(self):
+        """Gleicht den optimistisch gesetzten Zustand mit dem Gerät ab.
+
+        Hat das Gerät den Befehl nicht übernommen, wird der Zustand auf den
+        tatsächlichen Wert zurückgesetzt. Ohne Antwort bleibt er bis zum
+        nächsten Poll bestehen. Die Rückmeldung geht an alle Entitäten des
+        Keys (z.B. Switch und Select derselben Regelung).
+        """
+        key = self.coordinator_context
+        record = await self.coordinator.hub.async_read_back(key)
+        if record is None or self.hass is None:
+            return
+        if self._restore_from_record(record):
+            _LOGGER.warning(f"↩️ {self.name}: Befehl wurde vom Gerät nicht übernommen, Zustand zurückgesetzt")
+        self.coordinator.async_update_key_listeners((key,))
+
+    def _restore_from_record(self, record) -> bool:
+        """Setzt den Zustand aus dem zurückgelesenen Datensatz; True, wenn er sich geändert hat."""
+        return False
+
+    @property
+    def available(self):
+        """Verfügbar ab dem ersten gültigen Poll, solange der letzte Poll erfolgreich oder der Snapshot frisch ist."""
+        hub = self.coordinator.hub
+        if hub.last_good_update is None:
+            return False  # Noch kein Wert vom Gerät (Inventar ggf. aus dem Cache)
+        return self.coordinator.last_update_success or hub.snapshot_fresh
+
+    @property
+    def extra_state_attributes(self):
+        """Kennzeichnet veraltete Werte mit dem Zeitpunkt des letzten gültigen Polls."""
+        if self.coordinator.last_update_success:
+            return None
+
+        last_good_update = self.coordinator.hub.last_good_update
+        return {
+            "stale": True,
+            "last_good_update": last_good_update.isoformat() if last_good_update else None,
+        }
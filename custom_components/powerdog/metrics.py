@@ -0,0 +1,122 @@
+"""Laufzeitmetriken des PowerDog Hubs."""
+import bisect
+
+# Obergrenzen der Latenz-Buckets in Millisekunden (der letzte Bucket ist offen)
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class MethodMetrics:
+    """Aufrufzahlen, Fehler, Latenz-Histogramm und Antwortgrößen einer API-Methode."""
+
+    __slots__ = ("calls", "errors", "buckets", "latency_total", "latency_max", "latency_last",
+                 "bytes_total", "bytes_max", "bytes_last")
+
+    def __init__(self):
+        """Initialisiere leere Zähler."""
+        self.calls = 0
+        self.errors = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latency_last = 0.0
+        self.bytes_total = 0
+        self.bytes_max = 0
+        self.bytes_last = 0
+
+    def record(self, latency: float, size: int | None):
+        """Verbucht einen Aufruf; ``size`` ist None bei einem Fehler."""
+        latency_ms = latency * 1000
+        self.calls += 1
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.latency_total += latency_ms
+        self.latency_max = max(self.latency_max, latency_ms)
+        self.latency_last = latency_ms
+        if size is None:
+            self.errors += 1
+            return
+        self.bytes_total += size
+        self.bytes_max = max(self.bytes_max, size)
+        self.bytes_last = size
+
+    def as_dict(self) -> dict:
+        """Liefert die Werte für Diagnostics."""
+        successes = self.calls - self.errors
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_ms": {
+                "mean": round(self.latency_total / self.calls, 1) if self.calls else None,
+                "max": round(self.latency_max, 1),
+                "last": round(self.latency_last, 1),
+                "histogram": dict(zip(labels, self.buckets)),
+            },
+            "response_bytes": {
+                "mean": round(self.bytes_total / successes) if successes else None,
+                "max": self.bytes_max,
+                "last": self.bytes_last,
+            },
+        }
+
+
+class PowerDogMetrics:
+    """Sammelt RPC-, Poll- und Fan-out-Metriken eines Hubs."""
+
+    def __init__(self):
+        """Initialisiere leere Metriken."""
+        self.methods = {}
+        self.poll_jitter_last = 0.0
+        self.poll_jitter_max = 0.0
+        self.poll_overruns = 0
+        self.entities_updated_last = 0
+        self.entities_updated_total = 0
+        self.update_cycles = 0
+
+    def record_call(self, method: str, latency: float, size: int | None):
+        """Verbucht einen RPC-Aufruf (``size`` None = Fehler)."""
+        metrics = self.methods.get(method)
+        if metrics is None:
+            metrics = self.methods[method] = MethodMetrics()
+        metrics.record(latency, size)
+
+    def record_poll_jitter(self, lateness: float):
+        """Verbucht, wie viele Sekunden ein Poll nach seinem Termin gestartet ist."""
+        self.poll_jitter_last = lateness
+        self.poll_jitter_max = max(self.poll_jitter_max, lateness)
+
+    def record_overrun(self, missed: int):
+        """Verbucht übersprungene Poll-Termine."""
+        self.poll_overruns += missed
+
+    def record_fanout(self, updated: int):
+        """Verbucht, wie viele Entitäten in einem Zyklus aktualisiert wurden."""
+        self.entities_updated_last = updated
+        self.entities_updated_total += updated
+        self.update_cycles += 1
+
+    @property
+    def errors(self) -> int:
+        """Fehler über alle Methoden."""
+        return sum(m.errors for m in self.methods.values())
+
+    def method(self, method: str) -> MethodMetrics | None:
+        """Metriken einer Methode oder None, wenn sie noch nie aufgerufen wurde."""
+        return self.methods.get(method)
+
+    def as_dict(self) -> dict:
+        """Liefert alle Metriken für Diagnostics."""
+        return {
+            "rpc": {method: m.as_dict() for method, m in sorted(self.methods.items())},
+            "poll": {
+                "jitter_ms_last": round(self.poll_jitter_last * 1000, 1),
+                "jitter_ms_max": round(self.poll_jitter_max * 1000, 1),
+                "overruns": self.poll_overruns,
+            },
+            "fanout": {
+                "entities_updated_last": self.entities_updated_last,
+                "entities_updated_mean": (
+                    round(self.entities_updated_total / self.update_cycles, 1) if self.update_cycles else None
+                ),
+                "cycles": self.update_cycles,
+            },
+        }
@@ -0,0 +1,113 @@
+"""Kompakte Datensätze für das PowerDog Inventar."""
+
+# Zusätzliche Zählerwerte, die für Counter als eigene Sensoren angelegt werden
+USAGE_TYPES = ("30Day_Usage", "Today_Usage", "Year_Usage")
+
+# LinearType der abgeleiteten Usage-Sensoren (kommt so nicht vom Gerät)
+USAGE_LINEAR_TYPE = "usage"
+
+# LinearType der vom Hub berechneten Sensoren (Summen, Differenzen, Verhältnisse)
+DERIVED_LINEAR_TYPE = "derived"
+
+# Einheiten von Energiezählern (Zählerstände, die nur steigen)
+ENERGY_UNITS = ("Wh", "kWh", "MWh")
+
+# Markiert Datensätze, deren Wert noch nie an die Entitäten gemeldet wurde
+UNPUBLISHED = object()
+
+
+def usage_key(key: str, usage_type: str) -> str:
+    """Key des abgeleiteten Usage-Sensors eines Counters (z.B. ``c1_year_usage``)."""
+    return f"{key}_{usage_type.lower()}"
+
+
+class PowerDogValue:
+    """Metadaten und aktueller Wert eines Keys (Gerät oder abgeleiteter Usage-Sensor).
+
+    Ersetzt die rohen ``entity_info``-Dicts: es werden nur die Felder
+    gehalten, die die Entitäten tatsächlich brauchen.
+    """
+
+    __slots__ = (
+        "key",
+        "name",
+        "unit",
+        "linear_type",
+        "setable",
+        "minimum",
+        "maximum",
+        "switch_mode",
+        "switch_state",
+        "on_off",
+        "value",
+        "published",
+        "filtered",
+        "stats",
+    )
+
+    def __init__(self, key: str, name: str, unit: str = "", value=None, linear_type: str = "",
+                 setable: str = "", minimum=None, maximum=None, switch_mode=None, switch_state=None,
+                 on_off=None):
+        """Initialisiere den Datensatz."""
+        self.key = key
+        self.name = name
+        self.unit = unit
+        self.linear_type = linear_type
+        self.setable = setable
+        self.minimum = minimum
+        self.maximum = maximum
+        self.switch_mode = switch_mode
+        self.switch_state = switch_state
+        self.on_off = on_off
+        self.value = value
+        self.published = UNPUBLISHED
+        self.filtered = False  # True → Deadband-Filter gilt (nur reine Sensoren)
+        self.stats = None  # (min, max, mean, count) des zuletzt veröffentlichten Sampling-Fensters
+
+    @classmethod
+    def from_info(cls, key: str, entity_info: dict) -> "PowerDogValue":
+        """Erstellt den Datensatz aus einem Eintrag der Discovery-Antwort."""
+        return cls(
+            key,
+            entity_info.get("Name", key),
+            entity_info.get("Unit", ""),
+            entity_info.get("Current_Value"),
+            linear_type=entity_info.get("LinearType", ""),
+            setable=entity_info.get("Setable", ""),
+            minimum=entity_info.get("Min"),
+            maximum=entity_info.get("Max"),
+            switch_mode=entity_info.get("SwitchMode"),
+            switch_state=entity_info.get("SwitchState"),
+            on_off=entity_info.get("OnOff"),
+        )
+
+    def update_from(self, other: "PowerDogValue"):
+        """Übernimmt die Metadaten eines neu gefundenen Datensatzes; Wert und Meldestatus bleiben."""
+        self.name = other.name
+        self.unit = other.unit
+        self.linear_type = other.linear_type
+        self.setable = other.setable
+        self.minimum = other.minimum
+        self.maximum = other.maximum
+        self.switch_mode = other.switch_mode
+        self.switch_state = other.switch_state
+        self.on_off = other.on_off
+
+    @classmethod
+    def usage_from_info(cls, key: str, usage_type: str, entity_info: dict) -> "PowerDogValue":
+        """Erstellt den abgeleiteten Usage-Sensor (z.B. Today_Usage) eines Counters."""
+        base_unit = entity_info.get("Unit", "W")
+        time_unit = entity_info.get("Unit_Time_Add", "")
+
+        if time_unit.lower() == "h":
+            correct_unit = base_unit + "h"  # z.B. "Wh", "kWh", "MWh"
+        else:
+            correct_unit = base_unit
+
+        return cls(
+            usage_key(key, usage_type),
+            f"{entity_info.get('Name', 'Unknown')} {usage_type.replace('_', ' ')}",
+            correct_unit,
+            entity_info[usage_type],
+            linear_type=USAGE_LINEAR_TYPE,
+        )
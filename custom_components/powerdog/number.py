@@ -1,95 +1,172 @@
 import logging
-import asyncio
 from homeassistant.components.number import NumberEntity
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.const import PERCENTAGE  # ⚠️ Hier den richtigen Wert importieren
+from .entity import PowerDogEntity, async_setup_key_entities, device_info, unique_id_for
 from . import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
+MIN_WRITE_INTERVAL = 1.0  # Sekunden; höchstens ein Schreibbefehl je Entität in diesem Abstand
+
 async def async_setup_entry(hass, entry, async_add_entities):
     """Number-Setup für PowerDog."""
     _LOGGER.debug("🔄 async_setup_entry für Numbers wurde aufgerufen!")
 
-    hub = hass.data[DOMAIN]["hub"]
-    entities = [PowerDogNumber(hub, entry, entity_id, entity) for entity_id, entity in hub.numbers.items()]
-
-    async_add_entities(entities, True)
+    data = hass.data[DOMAIN][entry.entry_id]
+    hub = data["hub"]
+    coordinator = data["coordinator"]
+    entities = async_setup_key_entities(
+        hass,
+        entry,
+        "number",
+        lambda entity_id, record: PowerDogNumber(coordinator, hub, entry, entity_id, record),
+        async_add_entities,
+    )
     _LOGGER.debug(f"🚀 {len(entities)} NUMBER-Entitäten erfolgreich hinzugefügt!")
 
-class PowerDogNumber(NumberEntity):
-    def __init__(self, hub, entry, entity_id, entity_info):
+class PowerDogNumber(PowerDogEntity, NumberEntity):
+    """Ein PowerDog Sollwert.
+
+    Neue Werte werden entprellt gesendet: erst wenn der Wert
+    ``hub.settle_time`` lang unverändert blieb, höchstens einmal je
+    ``MIN_WRITE_INTERVAL`` und immer nur der neueste. Je Entität läuft
+    höchstens ein Schreibbefehl; ein dabei eingegangener neuerer Wert
+    wird danach gesendet, das Ergebnis des überholten verworfen.
+    """
+
+    def __init__(self, coordinator, hub, entry, entity_id, record):
+        super().__init__(coordinator, context=entity_id)
         self._hub = hub
         self._entry = entry
         self._entity_id = entity_id
-        self._name = f"{entity_info.get('Name', entity_id)}"
+        self._name = f"{record.name or entity_id}"
         _LOGGER.debug(f"🔧 Initialisiere Number {self._name}...")
-        self._state = entity_info.get("Current_Value", None)
-        self._unit = entity_info.get("Unit", "")
-        self._attr_unique_id = f"powerdog_{self._entity_id}"
+        self._state = record.value
+        self._unit = record.unit or ""
+        self._attr_unique_id = unique_id_for("number", entry.entry_id, entity_id)
         # Wert setzen
-        self._value = float(entity_info.get("Current_Value", 0))
+        self._value = float(record.value or 0)
 
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, str(entry.entry_id))},  # Nutze `entry_id`
-            name="PowerDog",
-            manufacturer="PowerDog",
-            model="API"
-        )
+        self._attr_device_info = device_info(entry, hub)
 
-        self._attr_native_value = float(entity_info.get("Current_Value", 0))
-        self._attr_native_min_value = float(entity_info.get("Min", 0))
-        self._attr_native_max_value = float(entity_info.get("Max", 100))
+        self._attr_native_value = float(record.value or 0)
+        self._attr_native_min_value = float(record.minimum if record.minimum is not None else 0)
+        self._attr_native_max_value = float(record.maximum if record.maximum is not None else 100)
 
         # Falls die Einheit Prozent ist, setze sie explizit
         self._attr_native_unit_of_measurement = PERCENTAGE if "percent" in self._name.lower() else None
 
-    @property
-    def unique_id(self):
-        """Gibt eine eindeutige ID für die Entität zurück."""
-        return f"powerdog_number_{self._entity_id}"
+        # Entprelltes Schreiben: noch nicht gesendeter Wert, Timer, laufender Befehl
+        self._pending_value = None
+        self._cancel_write = None
+        self._write_task = None
+        self._last_write = None
 
     @property
     def name(self):
         return self._name
 
+    @property
+    def _writing(self) -> bool:
+        """True, solange ein Wert auf das Senden wartet oder gesendet wird."""
+        return self._pending_value is not None or self._write_task is not None
+
+    async def async_added_to_hass(self):
+        """Verwirft beim Entfernen einen noch nicht gesendeten Wert."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_cancel_write)
+
+    @callback
+    def _async_cancel_write(self):
+        """Stoppt den Timer und verwirft den anstehenden Wert."""
+        if self._cancel_write is not None:
+            self._cancel_write()
+            self._cancel_write = None
+        self._pending_value = None
+
+    def _restore_from_record(self, record) -> bool:
+        """Übernimmt den zurückgelesenen Wert, sofern kein neuerer unterwegs ist."""
+        if self._writing:
+            return False
+        try:
+            value = float(record.value)
+        except (TypeError, ValueError):
+            return False
+        if value == self._attr_native_value:
+            return False
+        self._attr_native_value = value
+        return True
+
     async def async_set_native_value(self, value: float):
-        """Setzt einen neuen Wert asynchron."""
+        """Übernimmt den Wert sofort in den Zustand und sendet ihn entprellt an das Gerät."""
         _LOGGER.debug(f"🔄 Setze {self._name} auf {value}...")
-
-        def sync_call():
-            """Führe den blockierenden API-Call in einem separaten Thread aus."""
-            try:
-                return self._hub.client.setRegulationParameter(
-                    self._hub.password, self._entity_id, "value", str(value)
-                )
-            except Exception as e:
-                _LOGGER.error(f"❌ API-Fehler beim Setzen von {self._name}: {e}")
-                return None
-
-        response = await asyncio.to_thread(sync_call)
-
-        if response and response.get("ErrorCode") == 0:
-            self._attr_native_value = value
-            self.async_write_ha_state()
-            self._hub.numbers[self._entity_id]["Current_Value"] = value
+        self._attr_native_value = value
+        self.async_write_ha_state()
+
+        self._pending_value = value
+        if self._write_task is None:
+            self._async_schedule_write()
+        # Sonst plant der laufende Befehl nach seinem Ende den neuesten Wert ein
+
+    @callback
+    def _async_schedule_write(self):
+        """(Neu) Starten des Timers bis zum Senden des anstehenden Werts."""
+        if self._cancel_write is not None:
+            self._cancel_write()
+        delay = self._hub.settle_time
+        if self._last_write is not None:
+            delay = max(delay, self._last_write + MIN_WRITE_INTERVAL - self.hass.loop.time())
+        self._cancel_write = async_call_later(self.hass, delay, self._async_start_write)
+
+    @callback
+    def _async_start_write(self, _now):
+        """Sendet den anstehenden Wert, sobald er sich lange genug nicht geändert hat."""
+        self._cancel_write = None
+        if self._pending_value is None:
+            return
+        self._write_task = self.hass.async_create_task(self._async_write())
+
+    async def _async_write(self):
+        """Sendet den anstehenden Wert und übernimmt das Ergebnis, sofern er nicht überholt wurde."""
+        value, self._pending_value = self._pending_value, None
+        self._last_write = self.hass.loop.time()
+        try:
+            success = await self._hub.async_set_regulation_parameter(self._entity_id, "value", value)
+        finally:
+            self._write_task = None
+
+        if self._pending_value is not None:
+            # Während des Sendens kam ein neuerer Wert → nur der zählt
+            _LOGGER.debug(f"⏭️ {self._name}: {value} überholt von {self._pending_value}")
+            self._async_schedule_write()
+            return
+
+        if self.hass is None:
+            return  # Inzwischen entfernt
+
+        record = self._hub.numbers.get(self._entity_id)
+        if success:
+            if record is not None:
+                record.value = value
             _LOGGER.debug(f"✅ {self._name} erfolgreich auf {value} gesetzt")
+            self._async_schedule_confirm()
         else:
-            _LOGGER.error(f"❌ Fehler beim Setzen von {self._name}: {response}")
+            _LOGGER.error(f"❌ Fehler beim Setzen von {self._name} auf {value}")
+            if record is not None and self._restore_from_record(record):
+                self.async_write_ha_state()
 
-    async def async_update(self):
-            """Aktualisiert den Wert aus dem Hub."""
-            if self._entity_id not in self._hub.numbers:
-                _LOGGER.warning(f"⚠️ Entität {self._entity_id} existiert nicht mehr im Hub-Datenbestand!")
-                return
+    @callback
+    def _handle_coordinator_update(self):
+        """Übernimmt den neuen Wert aus dem Hub, sobald der Coordinator aktualisiert hat."""
+        if self._entity_id not in self._hub.numbers:
+            _LOGGER.warning(f"⚠️ Entität {self._entity_id} existiert nicht mehr im Hub-Datenbestand!")
+            return
 
-            value = self._hub.numbers.get(self._entity_id, {}).get("Current_Value")
-            if value is not None:
-                self._attr_native_value = value
+        value = self._hub.numbers[self._entity_id].value
+        if value is not None and not self._writing:
+            self._attr_native_value = value
 
-            # ✅ Erst updaten, wenn die Entität wirklich registriert wurde
-            if self.registry_entry:
-                self.async_write_ha_state()
-                _LOGGER.debug(f"🔄 {self._name} aktualisiert auf {self._state}")
-            else:
-                _LOGGER.warning(f"⚠️ HA hat {self._name} noch nicht registriert!")
+        self.async_write_ha_state()
+        _LOGGER.debug(f"🔄 {self._name} aktualisiert auf {self._attr_native_value}")
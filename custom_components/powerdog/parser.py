@@ -0,0 +1,166 @@
+"""Streaming-Parser für getAllCurrentLinearValues-Antworten."""
+from xml.parsers import expat
+
+from .api import PowerDogApiError, PowerDogApiFault
+
+# Verschachtelungstiefe der <struct>-Elemente in der Antwort:
+# 1 = {ErrorCode, Reply}, 2 = Reply {Key: ...}, 3 = Werte eines Keys
+_DEPTH_TOP = 1
+_DEPTH_REPLY = 2
+_DEPTH_KEY = 3
+
+_INT_TYPES = frozenset(("int", "i4", "i8"))
+# Fehler, die beim Parsen oder Umwandeln einer kaputten Antwort auftreten können
+# (expat reicht Ausnahmen aus den Handlern unverändert durch)
+_PARSE_ERRORS = (expat.ExpatError, ValueError, TypeError, IndexError)
+
+_VALUE_TYPES = frozenset(("int", "i4", "i8", "double", "boolean", "string", "nil", "dateTime.iso8601", "base64"))
+
+
+def _convert(value_type, text):
+    """Wandelt den Text eines XML-RPC-Skalars in den passenden Python-Wert um."""
+    if value_type in _INT_TYPES:
+        return int(text)
+    if value_type == "double":
+        return float(text)
+    if value_type == "boolean":
+        return text.strip() == "1"
+    if value_type == "nil":
+        return None
+    return text
+
+
+class LinearValuesParser:
+    """Liest eine getAllCurrentLinearValues-Antwort beim Empfang mit expat.
+
+    Es wird kein Dict-Baum aufgebaut: nur Felder, die im Routing-Index des
+    Hubs stehen, werden umgewandelt und direkt in die ``PowerDogValue``-
+    Datensätze geschrieben. Alles andere wird überlesen.
+
+    Nach ``close()`` stehen bereit:
+    - ``touched``: die beschriebenen Datensätze (für die Änderungserkennung)
+    - ``count``: Anzahl der Keys in der Antwort
+    - ``error_code``: ErrorCode der Antwort
+    """
+
+    def __init__(self, routes: dict):
+        """Initialisiere den Parser mit dem Routing-Index des Hubs."""
+        self._routes = routes
+        self.touched = []
+        self.count = 0
+        self.error_code = None
+
+        self._depth = 0
+        self._names = [None] * (_DEPTH_KEY + 1)
+        self._targets = None  # Ziele des aktuellen Keys
+        self._seen = None  # bereits geschriebene Ziele des aktuellen Keys
+        self._fault = False
+
+        self._in_name = False
+        self._capture = None  # Ziel des gerade gelesenen Werts ("ErrorCode" oder Index in _targets)
+        self._capture_level = 0
+        self._value_type = None
+        self._value_text = None
+        self._text = []
+        self._level = 0
+
+        self._parser = expat.ParserCreate()
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._parser.CharacterDataHandler = self._data
+
+    def feed(self, chunk: bytes):
+        """Verarbeitet den nächsten Teil der Antwort."""
+        try:
+            self._parser.Parse(chunk, False)
+        except _PARSE_ERRORS as e:
+            raise PowerDogApiError(f"getAllCurrentLinearValues: ungültige Antwort ({e})") from e
+
+    def close(self):
+        """Schließt das Parsen ab; wirft bei Faults oder unvollständigen Antworten."""
+        try:
+            self._parser.Parse(b"", True)
+        except _PARSE_ERRORS as e:
+            raise PowerDogApiError(f"getAllCurrentLinearValues: ungültige Antwort ({e})") from e
+        if self._fault:
+            raise PowerDogApiFault("getAllCurrentLinearValues: Fault")
+
+    def _start(self, tag, _attrs):
+        self._level += 1
+
+        if tag == "struct":
+            self._depth += 1
+            if self._depth == _DEPTH_KEY and self._capture is None:
+                self.count += 1
+                self._targets = self._routes.get(self._names[_DEPTH_REPLY])
+                self._seen = [False] * len(self._targets) if self._targets else None
+        elif tag == "name":
+            self._in_name = True
+            self._text = []
+        elif tag == "value":
+            if self._capture is None:
+                self._start_value()
+        elif tag in _VALUE_TYPES:
+            if self._capture is not None and self._level == self._capture_level + 1:
+                self._value_type = tag
+                self._text = []
+        elif tag == "fault":
+            self._fault = True
+
+    def _start_value(self):
+        """Beginnt das Lesen eines Werts, falls er zu einem gesuchten Feld gehört."""
+        field = self._names[self._depth] if self._depth <= _DEPTH_KEY else None
+        if self._depth == _DEPTH_TOP and field == "ErrorCode":
+            self._capture = "ErrorCode"
+        elif self._depth == _DEPTH_KEY and self._targets:
+            for index, (target_field, _, _) in enumerate(self._targets):
+                if target_field == field:
+                    self._capture = index
+                    break
+        if self._capture is not None:
+            self._capture_level = self._level
+            self._value_type = None
+            self._value_text = None
+            self._text = []
+
+    def _end(self, tag):
+        if tag == "struct":
+            if self._depth == _DEPTH_KEY and self._capture is None and self._targets:
+                self._finish_key()
+            self._depth -= 1
+        elif tag == "name" and self._in_name:
+            self._in_name = False
+            if self._depth <= _DEPTH_KEY:
+                self._names[self._depth] = "".join(self._text)
+        elif tag == "value" and self._capture is not None and self._level == self._capture_level:
+            self._finish_value()
+        elif tag == self._value_type and self._capture is not None and self._level == self._capture_level + 1:
+            self._value_text = "".join(self._text)
+
+        self._level -= 1
+
+    def _data(self, text):
+        if self._in_name or self._capture is not None:
+            self._text.append(text)
+
+    def _finish_value(self):
+        """Wandelt den gelesenen Wert um und schreibt ihn ins Ziel."""
+        # Getypte Werte: nur der Text im Typ-Element; sonst alles innerhalb von <value>
+        text = self._value_text if self._value_type else "".join(self._text)
+        value = _convert(self._value_type, text)
+        if self._capture == "ErrorCode":
+            self.error_code = value
+        else:
+            _, _, record = self._targets[self._capture]
+            record.value = value
+            self._seen[self._capture] = True
+        self._capture = None
+
+    def _finish_key(self):
+        """Setzt fehlende Felder des Keys auf ihren Default und merkt die Datensätze vor."""
+        for index, (_, default, record) in enumerate(self._targets):
+            if not self._seen[index]:
+                record.value = default
+            self.touched.append(record)
+        self._targets = None
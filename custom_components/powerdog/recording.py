@@ -0,0 +1,140 @@
+"""Mitschnitt und Wiedergabe des XML-RPC-Verkehrs mit einem PowerDog.
+
+Ein Mitschnitt ist eine gzip-komprimierte JSON-Lines-Datei; je Request eine
+Zeile mit Zeitstempel, Methode, Dauer, Request, Antwort bzw. Fehler. Das
+Passwort wird vor dem Schreiben durch ``REDACTED`` ersetzt.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import time
+from xml.sax.saxutils import escape
+
+from .api import PowerDogApiClient, PowerDogApiError, STREAM_CHUNK_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+REDACTED = "********"
+FLUSH_EVERY = 50  # Einträge, nach denen der Puffer in die Datei geschrieben wird
+
+
+def _redact(body: bytes, password: str) -> bytes:
+    """Ersetzt das Passwort im XML-Request durch ``REDACTED``."""
+    if not password or password == REDACTED:
+        return body
+    return body.replace(escape(password).encode(), REDACTED.encode())
+
+
+def load_recording(path: str) -> list:
+    """Liest einen Mitschnitt; liefert die Einträge in Aufnahmereihenfolge."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class PowerDogRecorder:
+    """Schreibt Requests und Antworten eines ``PowerDogApiClient`` in eine Datei.
+
+    Die Einträge werden gepuffert und im Executor angehängt, damit der
+    Event-Loop nicht auf die Platte wartet. Ein Lock hält die
+    Schreibvorgänge nacheinander, damit sich gzip-Anhänge nicht überlappen.
+    """
+
+    def __init__(self, path: str, password: str = ""):
+        """Initialisiere den Mitschnitt nach ``path`` (wird angehängt, falls vorhanden)."""
+        self.path = path
+        self.entries = 0
+        self._password = password
+        self._buffer = []
+        self._flush_task = None
+        self._lock = asyncio.Lock()
+
+    def record(self, method: str, request: bytes, response: bytes | None, latency: float,
+               error: str | None = None):
+        """Nimmt einen Request mit Antwort (oder Fehler) auf."""
+        entry = {
+            "ts": round(time.time(), 3),
+            "m": method,
+            "d": round(latency, 4),
+            "q": _redact(request, self._password).decode("utf-8", "surrogateescape"),
+            "r": response.decode("utf-8", "surrogateescape") if response is not None else None,
+        }
+        if error is not None:
+            entry["e"] = error
+        self._buffer.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+        self.entries += 1
+
+        if len(self._buffer) >= FLUSH_EVERY and self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._async_background_flush())
+
+    async def _async_background_flush(self):
+        """Automatisches Schreiben nach ``FLUSH_EVERY`` Einträgen; die Task bleibt bis zum Ende gemerkt."""
+        try:
+            await self.async_flush()
+        finally:
+            self._flush_task = None
+
+    async def async_flush(self):
+        """Schreibt alle gepufferten Einträge in die Datei (wartet auf ein laufendes Schreiben)."""
+        async with self._lock:
+            lines, self._buffer = self._buffer, []
+            if lines:
+                await asyncio.get_running_loop().run_in_executor(None, self._write, lines)
+
+    def _write(self, lines: list):
+        with gzip.open(self.path, "at", encoding="utf-8", errors="surrogateescape") as file:
+            file.write("\n".join(lines) + "\n")
+
+
+class PowerDogReplayClient(PowerDogApiClient):
+    """Beantwortet Aufrufe aus einem Mitschnitt statt über HTTP.
+
+    Zu jedem Request wird der nächste aufgenommene Eintrag mit gleichem
+    Request (sonst gleicher Methode) geliefert; ist die Aufnahme erschöpft,
+    beginnt sie von vorn. Die aufgenommene Dauer wird durch ``speed``
+    geteilt abgewartet (1 = Originaltempo, 0 = ohne Wartezeit).
+    Breaker, Metriken und Decoding laufen wie beim echten Client.
+    """
+
+    def __init__(self, entries: list, speed: float = 1.0):
+        """Initialisiere die Wiedergabe der Einträge aus ``load_recording``."""
+        super().__init__("replay", 0, REDACTED)
+        self.url = "replay://"
+        self.speed = speed
+        self._by_request = {}
+        self._by_method = {}
+        for entry in entries:
+            self._by_request.setdefault((entry["m"], entry["q"]), []).append(entry)
+            self._by_method.setdefault(entry["m"], []).append(entry)
+        self._cursors = {}
+
+    def _next(self, key, entries: list):
+        """Nächster Eintrag einer Liste, zyklisch."""
+        index = self._cursors.get(key, 0)
+        self._cursors[key] = index + 1
+        return entries[index % len(entries)]
+
+    async def _async_exchange(self, body: bytes, timeout: float | None, method: str, feed) -> tuple[bytes, int]:
+        """Liefert die aufgenommene Antwort mit der aufgenommenen Dauer."""
+        request = body.decode("utf-8", "surrogateescape")
+        if (method, request) in self._by_request:
+            entry = self._next((method, request), self._by_request[(method, request)])
+        elif method in self._by_method:
+            entry = self._next(method, self._by_method[method])
+        else:
+            raise PowerDogApiError(f"Kein Mitschnitt für {method}")
+
+        if self.speed:
+            await asyncio.sleep(entry["d"] / self.speed)
+        if entry["r"] is None:
+            raise PowerDogApiError(entry.get("e") or "Fehler im Mitschnitt")
+
+        payload = entry["r"].encode("utf-8", "surrogateescape")
+        if feed is None:
+            return payload, len(payload)
+        for offset in range(0, len(payload), STREAM_CHUNK_SIZE):
+            feed(payload[offset:offset + STREAM_CHUNK_SIZE])
+        return b"", len(payload)
+
+    async def async_close(self):
+        """Es gibt keine Verbindung zu schließen."""
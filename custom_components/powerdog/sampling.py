@@ -0,0 +1,161 @@
+"""Schnelles Sampling der PowerDog Werte in Ringpuffer."""
+import asyncio
+import logging
+import math
+from array import array
+
+from homeassistant.util import dt as dt_util
+from .api import PowerDogApiError
+from .parser import LinearValuesParser
+from .scheduler import ADAPTIVE_MAX_FACTOR
+
+_LOGGER = logging.getLogger(__name__)
+
+MIN_SAMPLING_INTERVAL = 0.2  # Sekunden; schneller wird das Gerät nie abgefragt
+RING_INTERVALS = 2  # Wie viele Poll-Intervalle (adaptiv: längste) ein Ringpuffer fasst
+
+
+class SampleRing:
+    """Ringpuffer fester Größe für die Samples eines Keys (``array('d')``, keine Objekte je Sample)."""
+
+    __slots__ = ("_data", "_pos", "_pending")
+
+    def __init__(self, size: int):
+        """Initialisiere einen leeren Puffer mit ``size`` Plätzen."""
+        self._data = array("d", [math.nan]) * size
+        self._pos = 0
+        self._pending = 0  # Samples seit dem letzten ``take``
+
+    def append(self, value: float):
+        """Schreibt ein Sample und überschreibt bei vollem Puffer das älteste."""
+        self._data[self._pos] = value
+        self._pos = (self._pos + 1) % len(self._data)
+        self._pending = min(self._pending + 1, len(self._data))
+
+    def take(self):
+        """Liefert ``(min, max, mean, count)`` der Samples seit dem letzten Aufruf oder None."""
+        count = self._pending
+        if not count:
+            return None
+        window = self._window()
+        self._pending = 0
+        return min(window), max(window), round(math.fsum(window) / count, 3), count
+
+    def resized(self, size: int) -> "SampleRing":
+        """Neuer Puffer mit ``size`` Plätzen, der die noch nicht abgeholten Samples übernimmt."""
+        ring = SampleRing(size)
+        for value in self._window()[-size:] if self._pending else ():
+            ring.append(value)
+        return ring
+
+    def _window(self) -> array:
+        """Die Samples seit dem letzten ``take`` in Aufnahmereihenfolge."""
+        start = self._pos - self._pending
+        if start >= 0:
+            return self._data[start:self._pos]
+        return self._data[start:] + self._data[:self._pos]
+
+
+class PowerDogSampler:
+    """Fragt getAllCurrentLinearValues in kurzem Takt ab und sammelt die Sensorwerte.
+
+    Die Werte landen wie beim normalen Poll direkt in den ``PowerDogValue``-
+    Datensätzen; numerische Sensorwerte zusätzlich in einem ``SampleRing``
+    je Key. Der Hub veröffentlicht im normalen Intervall nur das Fenster
+    seit dem letzten Poll (``take_window``).
+    """
+
+    def __init__(self, hub, interval: float):
+        """Initialisiere den Sampler für einen Hub."""
+        self.hub = hub
+        self.interval = max(interval, MIN_SAMPLING_INTERVAL)
+        self.size = 0
+        self.rings = {}  # Key → SampleRing
+        self.resize(hub.interval)
+        self.samples = 0  # Erfolgreiche Samples seit dem letzten ``take_window``
+        self.last_sample = None
+        self._touched = {}  # Key → Datensatz, seit dem letzten ``take_window`` beschrieben
+
+    def resize(self, poll_interval: float, adaptive: bool = False):
+        """Passt die Ringgröße an das Poll-Intervall an.
+
+        Beim adaptiven Polling kann ein Fenster bis zu ``ADAPTIVE_MAX_FACTOR``
+        Intervalle lang werden; die Ringe fassen dann entsprechend mehr.
+        """
+        longest = poll_interval * (ADAPTIVE_MAX_FACTOR if adaptive else 1)
+        size = math.ceil(longest * RING_INTERVALS / self.interval)
+        if size != self.size:
+            self.size = size
+            self.rings = {key: ring.resized(size) for key, ring in self.rings.items()}
+
+    def load(self):
+        """Legt die Ringpuffer für die aktiven Sensoren des aktuellen Inventars an."""
+        enabled = self.hub.enabled_keys
+        self.rings = {
+            key: self.rings.get(key) or SampleRing(self.size) for key in self.hub.sensors if key in enabled
+        }
+
+    async def async_run(self):
+        """Sampelt in festem Takt, bis der Task abgebrochen wird."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            await self._async_sample()
+            deadline += self.interval
+            now = loop.time()
+            if deadline < now:
+                deadline = now  # Sample hat länger gedauert → nicht aufholen
+            await asyncio.sleep(deadline - now)
+
+    async def _async_sample(self):
+        """Holt ein Sample aller Werte."""
+        routes, slow = self.hub.poll_routes()
+        if not routes:
+            return  # Noch keine aktiven Entitäten
+        parser = LinearValuesParser(routes)
+        async with self.hub.lock:
+            try:
+                await self.hub.api.async_call_streaming("getAllCurrentLinearValues", parser)
+            except PowerDogApiError as e:
+                _LOGGER.debug(f"⚠️ PowerDog Sample fehlgeschlagen: {e}")
+                return
+
+        if parser.error_code != 0 or not parser.touched:
+            return
+
+        rings = self.rings
+        for record in parser.touched:
+            self._touched[record.key] = record
+            ring = rings.get(record.key)
+            if ring is None:
+                continue
+            try:
+                ring.append(float(record.value))
+            except (TypeError, ValueError):
+                pass  # Nicht-numerische Werte werden nicht gesammelt
+
+        if slow:
+            self.hub.mark_slow_polled()
+        self.samples += 1
+        self.last_sample = dt_util.utcnow()
+        self.hub.last_value_count = parser.count
+
+    def take_window(self):
+        """Liefert ``(Datensätze, {Key: (min, max, mean, count)})`` seit dem letzten Aufruf.
+
+        None, wenn seit dem letzten Aufruf kein Sample gelungen ist.
+        """
+        if not self.samples:
+            return None
+
+        touched = list(self._touched.values())
+        stats = {}
+        for record in touched:
+            ring = self.rings.get(record.key)
+            window = ring.take() if ring is not None else None
+            if window is not None:
+                stats[record.key] = window
+
+        self.samples = 0
+        self._touched = {}
+        return touched, stats
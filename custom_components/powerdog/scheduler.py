@@ -0,0 +1,195 @@
+"""Poll-Scheduler für die PowerDog Integration."""
+import asyncio
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+MIN_INTERVAL = 5  # Sekunden; schneller wird auch adaptiv nie gepollt
+MAX_BACKOFF = 600  # Sekunden; längste Pause zwischen zwei Versuchen bei Fehlern
+MAX_CONCURRENT_POLLS = 4  # Maximale Anzahl gleichzeitig laufender Abfragen über alle Hubs
+
+# Versatz der Hubs im Intervall: Vielfache des Goldenen Schnitts (mod 1) verteilen
+# beliebig viele Hubs gleichmäßig, ohne die Gesamtzahl vorher zu kennen
+STAGGER_RATIO = 0.6180339887
+
+# Adaptives Polling: Anteil geänderter Werte, ab dem schneller bzw. langsamer gepollt wird
+ADAPTIVE_FAST_RATIO = 0.25
+ADAPTIVE_SLOW_RATIO = 0.02
+ADAPTIVE_MIN_FACTOR = 0.5
+ADAPTIVE_MAX_FACTOR = 4
+
+
+class PowerDogPollTarget:
+    """Takt und Zustand der Abfragen eines Coordinators."""
+
+    __slots__ = ("coordinator", "base_interval", "interval", "adaptive", "failures",
+                 "deadline", "scheduled_at", "handle", "task")
+
+    def __init__(self, coordinator, interval: float, adaptive: bool):
+        """Initialisiere den Takt für einen Coordinator."""
+        self.coordinator = coordinator
+        self.base_interval = interval
+        self.interval = interval
+        self.adaptive = adaptive
+        self.failures = 0
+        self.deadline = None
+        self.scheduled_at = None
+        self.handle = None
+        self.task = None  # Laufende Abfrage
+
+
+class PowerDogPollScheduler:
+    """Löst die Abfragen aller PowerDog Coordinators aus (ein Scheduler je Home Assistant).
+
+    - Jeder Hub hat seinen eigenen festen Takt; die Dauer der Abfrage
+      verschiebt den nächsten Termin nicht.
+    - Die Takte der Hubs sind gegeneinander versetzt, damit sie nicht
+      gleichzeitig abfragen.
+    - Abfragen verschiedener Hubs laufen parallel, höchstens
+      ``max_concurrent`` gleichzeitig.
+    - Nach Fehlern wird exponentiell länger gewartet, bis ``MAX_BACKOFF``.
+    - Mit ``adaptive`` wird schneller gepollt, solange sich viele Werte
+      ändern, und langsamer, solange alles stabil ist.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_concurrent: int = MAX_CONCURRENT_POLLS):
+        """Initialisiere den gemeinsamen Scheduler."""
+        self.hass = hass
+        self.max_concurrent = max_concurrent
+        self.targets = {}  # Coordinator → PowerDogPollTarget
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._added = 0
+
+    @callback
+    def async_add(self, coordinator, interval: float, adaptive: bool = False, immediate: bool = False):
+        """Nimmt einen Coordinator auf; gibt eine Funktion zum Entfernen zurück.
+
+        Mit ``immediate`` läuft die erste Abfrage sofort, sonst nach einem
+        Intervall. Danach liegt der Takt um den Versatz des Hubs verschoben.
+        """
+        target = PowerDogPollTarget(coordinator, interval, adaptive)
+        offset = (self._added * STAGGER_RATIO) % 1 * interval
+        self._added += 1
+        self.targets[coordinator] = target
+
+        now = self.hass.loop.time()
+        target.deadline = now + (0 if immediate else interval) + offset
+        self._async_schedule(target, now if immediate else target.deadline)
+
+        @callback
+        def async_remove():
+            self.async_remove(coordinator)
+
+        return async_remove
+
+    @callback
+    def async_update(self, coordinator, interval: float, adaptive: bool):
+        """Übernimmt ein neues Intervall bzw. adaptives Polling ohne Neustart des Takts.
+
+        Der nächste Termin wird um die Differenz der Intervalle verschoben;
+        eine laufende Abfrage plant danach bereits mit dem neuen Intervall.
+        """
+        target = self.targets.get(coordinator)
+        if target is None:
+            return
+
+        shift = interval - target.interval
+        target.base_interval = interval
+        target.interval = interval
+        target.adaptive = adaptive
+        if target.handle is None or target.failures:
+            return  # Abfrage läuft gerade bzw. Backoff bleibt bestehen
+
+        target.handle.cancel()
+        target.deadline = max(self.hass.loop.time(), target.deadline + shift)
+        self._async_schedule(target, target.deadline)
+
+    @callback
+    def async_remove(self, coordinator):
+        """Stoppt alle weiteren Abfragen eines Coordinators und bricht eine laufende ab."""
+        target = self.targets.pop(coordinator, None)
+        if target is None:
+            return
+        target.deadline = None
+        if target.handle is not None:
+            target.handle.cancel()
+            target.handle = None
+        if target.task is not None:
+            target.task.cancel()
+            target.task = None
+
+    @callback
+    def async_stop(self):
+        """Stoppt die Abfragen aller Coordinators."""
+        for coordinator in list(self.targets):
+            self.async_remove(coordinator)
+
+    @callback
+    def _async_schedule(self, target: PowerDogPollTarget, when: float):
+        """Plant die nächste Abfrage des Hubs zum Loop-Zeitpunkt ``when``."""
+        target.scheduled_at = when
+        target.handle = self.hass.loop.call_at(when, self._async_fire, target)
+
+    @callback
+    def _async_fire(self, target: PowerDogPollTarget):
+        """Startet die fällige Abfrage als Task."""
+        target.handle = None
+        lateness = max(0.0, self.hass.loop.time() - target.scheduled_at)
+        target.coordinator.hub.metrics.record_poll_jitter(lateness)
+        target.task = self.hass.async_create_task(self._async_poll(target))
+
+    async def _async_poll(self, target: PowerDogPollTarget):
+        """Fragt ab und berechnet den nächsten Termin."""
+        coordinator = target.coordinator
+        async with self._semaphore:
+            if target.deadline is None:
+                return  # Beim Warten auf einen freien Platz entfernt
+            await coordinator.async_refresh()
+        target.task = None
+        if target.deadline is None:
+            return  # Während der Abfrage entfernt
+
+        now = self.hass.loop.time()
+        if coordinator.last_update_success:
+            target.failures = 0
+            if target.adaptive:
+                self._adapt(target)
+            target.deadline += target.interval
+            if target.deadline <= now:
+                # Abfrage hat länger als ein Intervall gedauert → verpasste Termine überspringen
+                missed = int((now - target.deadline) // target.interval) + 1
+                _LOGGER.debug(f"⏱️ PowerDog {coordinator.hub.host} Poll-Überlauf, {missed} Termin(e) übersprungen")
+                coordinator.hub.metrics.record_overrun(missed)
+                target.deadline += missed * target.interval
+        else:
+            target.failures += 1
+            backoff = min(MAX_BACKOFF, target.base_interval * 2 ** target.failures)
+            _LOGGER.debug(f"⏳ PowerDog {coordinator.hub.host} nicht erreichbar, nächster Versuch in {backoff:.0f}s")
+            target.deadline = now + backoff
+
+        self._async_schedule(target, target.deadline)
+
+    @staticmethod
+    def _adapt(target: PowerDogPollTarget):
+        """Passt das Intervall an die Änderungsrate der letzten Abfrage an."""
+        coordinator = target.coordinator
+        ratio = len(coordinator.data or ()) / max(1, coordinator.hub.last_value_count)
+        if ratio >= ADAPTIVE_FAST_RATIO:
+            interval = target.interval / 2
+        elif ratio <= ADAPTIVE_SLOW_RATIO:
+            interval = target.interval * 1.5
+        else:
+            return
+
+        interval = min(
+            max(interval, MIN_INTERVAL, target.base_interval * ADAPTIVE_MIN_FACTOR),
+            target.base_interval * ADAPTIVE_MAX_FACTOR,
+        )
+        if interval != target.interval:
+            _LOGGER.debug(
+                f"🎚️ PowerDog {coordinator.hub.host} Poll-Intervall {target.interval:.1f}s → {interval:.1f}s "
+                f"(Änderungsrate {ratio:.0%})"
+            )
+            target.interval = interval
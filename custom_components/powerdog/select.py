@@ -1,94 +1,96 @@
 import logging
 from homeassistant.components.select import SelectEntity
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.core import callback
+from .entity import PowerDogEntity, async_setup_key_entities, device_info, unique_id_for
 from . import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
-    hub = hass.data[DOMAIN]["hub"]
-    entities = [PowerDogModeSelect(hub, entry, entity_id, entity) for entity_id, entity in hub.selects.items()]
-
-    async_add_entities(entities, True)
-
-class PowerDogModeSelect(SelectEntity):
-    def __init__(self, hub, entry, entity_id, entity_info):
+    data = hass.data[DOMAIN][entry.entry_id]
+    hub = data["hub"]
+    coordinator = data["coordinator"]
+    async_setup_key_entities(
+        hass,
+        entry,
+        "select",
+        lambda entity_id, record: PowerDogModeSelect(coordinator, hub, entry, entity_id, record),
+        async_add_entities,
+    )
+
+class PowerDogModeSelect(PowerDogEntity, SelectEntity):
+    def __init__(self, coordinator, hub, entry, entity_id, record):
+        super().__init__(coordinator, context=entity_id)
         self._hub = hub
         self._entry = entry
         self._entity_id = entity_id
-        self._name = f"{entity_info.get('Name', entity_id)}"
-        self._state = entity_info.get("Current_Value", None)
-        self._unit = entity_info.get("Unit", "")
-        self._attr_unique_id = f"powerdog_{self._entity_id}"
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, str(entry.entry_id))},  # Nutze `entry_id`
-            name="PowerDog",
-            manufacturer="PowerDog",
-            model="API"
-        )
+        self._name = f"{record.name or entity_id}"
+        self._unit = record.unit or ""
+        self._attr_unique_id = unique_id_for("select", entry.entry_id, entity_id)
+        self._attr_device_info = device_info(entry, hub)
 
         self._attr_options = ["Auto", "On", "Off"]
 
-        switch_mode = entity_info.get("SwitchMode", "0")  # Standard: Auto
-        switch_state = entity_info.get("SwitchState", "0")
-
-        if switch_mode == "0":
-            self._attr_current_option = "Auto"
-        elif switch_state == "100":
-            self._attr_current_option = "On"
-        else:
-            self._attr_current_option = "Off"
+        self._attr_current_option = self._option_from_record(record)
 
         _LOGGER.debug(f"🔍 {self._name} initialisiert mit Modus: {self._attr_current_option}")
 
+    @staticmethod
+    def _option_from_record(record) -> str:
+        """Leitet den Modus (Auto, On, Off) aus Modus und Status des Geräts ab."""
+        switch_mode = record.switch_mode or "0"  # Standard: Auto
+        switch_state = record.switch_state or "0"
+
+        if switch_mode == "0":
+            return "Auto"
+        if switch_state == "100":
+            return "On"
+        return "Off"
+
+    def _restore_from_record(self, record) -> bool:
+        """Übernimmt den zurückgelesenen Modus."""
+        option = self._option_from_record(record)
+        if option == self._attr_current_option:
+            return False
+        self._attr_current_option = option
+        return True
+
     @property
     def name(self):
         return self._name
 
-    @property
-    def state(self):
-        return self._state
-
-    def select_option(self, option):
+    async def async_select_option(self, option):
         """Setzt den Modus auf Auto, On oder Off."""
-        _LOGGER.debug(f"🔄 Moduswechsel auf {option} für {self._attr_name}")
-
-        try:
-            if option == "Auto":
-                response = self._hub.client.setRegulationParameter(
-                    self._hub.password, self._entity_id, "manual", "0"
-                )
-            else:
-                # In Manuell-Modus wechseln
-                self._hub.client.setRegulationParameter(
-                    self._hub.password, self._entity_id, "manual", "1"
-                )
-                if option == "On":
-                    response = self._hub.client.setRegulationParameter(
-                        self._hub.password, self._entity_id, "value", "100"
-                    )
-                else:
-                    response = self._hub.client.setRegulationParameter(
-                        self._hub.password, self._entity_id, "value", "0"
-                    )
+        _LOGGER.debug(f"🔄 Moduswechsel auf {option} für {self._name}")
 
+        if option == "Auto":
+            success = await self._hub.async_set_regulation_parameter(self._entity_id, "manual", "0")
+        else:
+            # In Manuell-Modus wechseln, dann schalten
+            success = await self._hub.async_set_regulation_parameters(
+                self._entity_id, [("manual", "1"), ("value", "100" if option == "On" else "0")]
+            )
+
+        if success:
+            # Optimistisch übernehmen; die Rückmeldung korrigiert Datensatz und Anzeige
+            record = self._hub.selects.get(self._entity_id)
+            if record is not None:
+                record.switch_mode = "0" if option == "Auto" else "1"
+                if option != "Auto":
+                    record.switch_state = "100" if option == "On" else "0"
             self._attr_current_option = option
-        except Exception as e:
-            _LOGGER.error(f"❌ Fehler beim Setzen des Modus für {self._attr_name}: {e}")
+            self.async_write_ha_state()
+            self._async_schedule_confirm()
+        else:
+            _LOGGER.error(f"❌ Fehler beim Setzen des Modus für {self._name}")
 
-    async def async_update(self):
-        """Aktualisiert den Wert aus dem Hub."""
+    @callback
+    def _handle_coordinator_update(self):
+        """Übernimmt den neuen Wert aus dem Hub, sobald der Coordinator aktualisiert hat."""
         if self._entity_id not in self._hub.selects:
             _LOGGER.warning(f"⚠️ Entität {self._entity_id} existiert nicht mehr im Hub-Datenbestand!")
             return
 
-        value = self._hub.selects[self._entity_id].get("Current_Value")
-        if value is not None:
-            self._state = value
-
-        # ✅ Erst updaten, wenn die Entität wirklich registriert wurde
-        if self.registry_entry:
-            self.async_write_ha_state()
-            _LOGGER.debug(f"🔄 {self._name} aktualisiert auf {self._state} von {value}")
-        else:
-            _LOGGER.warning(f"⚠️ HA hat {self._name} noch nicht registriert!")
+        self._attr_current_option = self._option_from_record(self._hub.selects[self._entity_id])
+        self.async_write_ha_state()
+        _LOGGER.debug(f"🔄 {self._name} aktualisiert auf {self._attr_current_option}")
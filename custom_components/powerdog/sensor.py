@@ -1,53 +1,85 @@
 import logging
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.sensor.const import SensorDeviceClass, SensorStateClass
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.const import EntityCategory
+from homeassistant.core import callback
+from .entity import PowerDogEntity, async_setup_key_entities, device_info, diagnostic_unique_id, unique_id_for
+from .model import DERIVED_LINEAR_TYPE, ENERGY_UNITS, USAGE_LINEAR_TYPE
 from . import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
+
+def _method_metric(method, attribute):
+    """Liest eine Kennzahl der Metriken einer API-Methode (None, solange nie aufgerufen)."""
+    def value(hub):
+        metrics = hub.metrics.method(method)
+        return getattr(metrics, attribute) if metrics else None
+    return value
+
+
+_MEASUREMENT = SensorStateClass.MEASUREMENT
+_TOTAL_INCREASING = SensorStateClass.TOTAL_INCREASING  # Zähler seit dem Start des Hubs
+
+# Diagnose-Sensoren: (Key, Name, Einheit, Zustandsklasse, Wertfunktion)
+DIAGNOSTIC_SENSORS = (
+    ("poll_latency", "Poll-Dauer", "ms", _MEASUREMENT, _method_metric("getAllCurrentLinearValues", "latency_last")),
+    ("poll_response_size", "Poll-Antwortgröße", "B", _MEASUREMENT, _method_metric("getAllCurrentLinearValues", "bytes_last")),
+    ("poll_jitter", "Poll-Jitter", "ms", _MEASUREMENT, lambda hub: round(hub.metrics.poll_jitter_last * 1000, 1)),
+    ("poll_overruns", "Poll-Überläufe", None, _TOTAL_INCREASING, lambda hub: hub.metrics.poll_overruns),
+    ("api_errors", "API-Fehler", None, _TOTAL_INCREASING, lambda hub: hub.metrics.errors),
+    ("entities_updated", "Aktualisierte Entitäten", None, _MEASUREMENT, lambda hub: hub.metrics.entities_updated_last),
+)
+
 async def async_setup_entry(hass, entry, async_add_entities):
     """Sensor-Setup für PowerDog."""
     _LOGGER.debug("🔄 async_setup_entry für Sensoren wurde aufgerufen!")
 
-    hub = hass.data[DOMAIN]["hub"]
-    entities = [PowerDogSensor(hub, entry, entity_id, entity) for entity_id, entity in hub.sensors.items()]
+    data = hass.data[DOMAIN][entry.entry_id]
+    hub = data["hub"]
+    coordinator = data["coordinator"]
+    entities = async_setup_key_entities(
+        hass,
+        entry,
+        "sensor",
+        lambda entity_id, record: PowerDogSensor(coordinator, hub, entry, entity_id, record),
+        async_add_entities,
+    )
 
-    async_add_entities(entities, True)
-    _LOGGER.debug(f"🚀 {len(entities)} SENSOR-Entitäten erfolgreich hinzugefügt!")
+    diagnostics = [PowerDogDiagnosticSensor(coordinator, hub, entry, *description) for description in DIAGNOSTIC_SENSORS]
+    async_add_entities(diagnostics)
+    _LOGGER.debug(f"🚀 {len(entities) + len(diagnostics)} SENSOR-Entitäten erfolgreich hinzugefügt!")
 
-class PowerDogSensor(SensorEntity):
+class PowerDogSensor(PowerDogEntity, SensorEntity):
     """Ein PowerDog Sensor."""
-    def __init__(self, hub, entry, entity_id, entity_info):
+    def __init__(self, coordinator, hub, entry, entity_id, record):
+        super().__init__(coordinator, context=entity_id)
         self._hub = hub
         self._entry = entry
         self._entity_id = entity_id
-        self._name = f"{entity_info.get('Name', entity_id)}"
-        self._state = entity_info.get("Current_Value", None)
-        self._unit = entity_info.get("Unit", "")
-        self._attr_unique_id = f"powerdog_{self._entity_id}"
+        self._name = f"{record.name or entity_id}"
+        self._state = record.value
+        self._unit = record.unit or ""
+        self._attr_unique_id = unique_id_for("sensor", entry.entry_id, entity_id)
+        # Abgeleitete Usage-Sensoren ändern sich selten und werden kaum genutzt
+        self._attr_entity_registry_enabled_default = record.linear_type != USAGE_LINEAR_TYPE
         # Wert setzen
-        self._value = float(entity_info.get("Current_Value", 0))
+        self._value = float(record.value or 0)
 
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, str(entry.entry_id))},  # Nutze `entry_id`
-            name="PowerDog",
-            manufacturer="PowerDog",
-            model="API"
-        )
+        self._attr_device_info = device_info(entry, hub)
 
         # Prüfen, ob es sich um einen Energiezähler handelt
-        if self._unit in ["Wh", "kWh", "MWh"]:
+        if self._unit in ENERGY_UNITS:
             self._attr_device_class = SensorDeviceClass.ENERGY
-            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+            # Differenzen von Zählern können sinken; nur reine Zählersummen steigen monoton
+            if record.linear_type == DERIVED_LINEAR_TYPE and entity_id not in hub.derived.increasing:
+                self._attr_state_class = SensorStateClass.TOTAL
+            else:
+                self._attr_state_class = SensorStateClass.TOTAL_INCREASING
         else:
             self._attr_device_class = None
             self._attr_state_class = SensorStateClass.MEASUREMENT
 
-    def update(self):
-        """Hole aktuelle Daten von der API."""
-        self._state = self._hub.sensors.get(self._entity_id, {}).get("Current_Value", None)
-
     @property
     def name(self):
         return self._name
@@ -60,23 +92,71 @@ class PowerDogSensor(SensorEntity):
     def unit_of_measurement(self):
         return self._unit
 
+    @property
+    def extra_state_attributes(self):
+        """Ergänzt bei schnellem Sampling Min/Max/Mittelwert des letzten Fensters."""
+        attributes = super().extra_state_attributes
+        record = self._hub.sensors.get(self._entity_id)
+        if record is None or record.stats is None:
+            return attributes
+
+        minimum, maximum, mean, count = record.stats
+        return {
+            **(attributes or {}),
+            "min": minimum,
+            "max": maximum,
+            "mean": mean,
+            "samples": count,
+        }
+
     async def async_added_to_hass(self):
         """Wird aufgerufen, wenn die Entität zu Home Assistant hinzugefügt wurde."""
+        await super().async_added_to_hass()
         _LOGGER.debug(f"✅ {self._name} wurde zu Home Assistant hinzugefügt!")
 
-    async def async_update(self):
-        """Aktualisiert den Wert aus dem Hub."""
+    @callback
+    def _handle_coordinator_update(self):
+        """Übernimmt den neuen Wert aus dem Hub, sobald der Coordinator aktualisiert hat."""
         if self._entity_id not in self._hub.sensors:
             _LOGGER.warning(f"⚠️ Entität {self._entity_id} existiert nicht mehr im Hub-Datenbestand!")
             return
 
-        value = self._hub.sensors[self._entity_id].get("Current_Value")
+        value = self._hub.sensors[self._entity_id].value
         if value is not None:
             self._state = value
 
-        # ✅ Erst updaten, wenn die Entität wirklich registriert wurde
-        if self.registry_entry:
-            self.async_write_ha_state()
-            _LOGGER.debug(f"🔄 {self._name} aktualisiert auf {self._state}")
-        else:
-            _LOGGER.warning(f"⚠️ HA hat {self._name} noch nicht registriert!")
+        self.async_write_ha_state()
+        _LOGGER.debug(f"🔄 {self._name} aktualisiert auf {self._state}")
+
+
+class PowerDogDiagnosticSensor(PowerDogEntity, SensorEntity):
+    """Diagnose-Sensor mit einer Laufzeitmetrik des Hubs (standardmäßig deaktiviert)."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, hub, entry, key, name, unit, state_class, value_fn):
+        super().__init__(coordinator)  # Ohne Kontext → nach jedem Poll aktualisiert
+        self._hub = hub
+        self._value_fn = value_fn
+        self._attr_name = f"PowerDog {name}"
+        self._attr_unique_id = diagnostic_unique_id(entry.entry_id, key)
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        self._attr_native_value = value_fn(hub)
+        self._attr_device_info = device_info(entry, hub)
+
+    @property
+    def available(self):
+        """Metriken sind auch verfügbar, wenn das Gerät nicht antwortet."""
+        return True
+
+    @property
+    def extra_state_attributes(self):
+        return None
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Übernimmt den aktuellen Metrikwert nach jedem Poll."""
+        self._attr_native_value = self._value_fn(self._hub)
+        self.async_write_ha_state()
@@ -0,0 +1,241 @@
+"""Services der PowerDog Integration (für alle PowerDogs gemeinsam)."""
+import asyncio
+import fnmatch
+import logging
+import re
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+from .entity import key_from_unique_id
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_GET_SNAPSHOT = "get_snapshot"
+SERVICE_SET_REGULATION = "set_regulation"
+SERVICE_SET_AUTO_MODE = "set_auto_mode"
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_TYPE = "type"
+ATTR_KEY = "key"
+ATTR_COMPACT = "compact"
+ATTR_MODE = "mode"
+ATTR_VALUE = "value"
+
+MODE_AUTO = "auto"
+MODE_ON = "on"
+MODE_OFF = "off"
+
+GET_SNAPSHOT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_TYPE): vol.All(cv.ensure_list, [vol.In(("sensor", "switch", "select", "number"))]),
+        vol.Optional(ATTR_KEY): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_COMPACT, default=False): cv.boolean,
+    }
+)
+
+SET_REGULATION_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+            vol.Optional(ATTR_KEY): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional(ATTR_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+            vol.Exclusive(ATTR_MODE, "target"): vol.In((MODE_AUTO, MODE_ON, MODE_OFF)),
+            vol.Exclusive(ATTR_VALUE, "target"): vol.Coerce(float),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_ENTITY_ID, ATTR_KEY),
+    cv.has_at_least_one_key(ATTR_MODE, ATTR_VALUE),
+)
+
+SET_AUTO_MODE_SCHEMA = vol.Schema({vol.Required(ATTR_ENTITY_ID): cv.entity_ids})
+
+
+def _key_pattern(patterns):
+    """Fasst Wildcard-Muster (``*``, ``?``) zu einem Regex zusammen; None = alle Keys."""
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+def _loaded_hubs(hass: HomeAssistant) -> dict:
+    """Entry-ID → Daten (``hub``, ``coordinator``) aller geladenen PowerDogs."""
+    return {
+        entry_id: data
+        for entry_id, data in hass.data.get(DOMAIN, {}).items()
+        if isinstance(data, dict) and "hub" in data  # nicht z.B. der gemeinsame Scheduler
+    }
+
+
+def _regulation_parameters(record, mode: str | None, value: float | None) -> list:
+    """Parameter für setRegulationParameter, die ``mode`` bzw. ``value`` auf dem Key umsetzen.
+
+    Wirft ValueError, wenn der Key das nicht unterstützt.
+    """
+    setable = (record.setable or "").lower()
+    if value is not None:
+        if "value(double)" not in setable:
+            raise ValueError("Key hat keinen Sollwert")
+        return [("value", value)]
+    if mode == MODE_AUTO:
+        return [("manual", "0")]
+
+    on = mode == MODE_ON
+    if "onoff(bool)" in setable:
+        return [("onoff", "1" if on else "0")]
+    if "manual(bool)" in setable:
+        # Manual/Auto-Regelung zuerst auf manuellen Modus setzen, dann schalten
+        return [("manual", "1"), ("value", "100" if on else "0")]
+    raise ValueError("Key ist nicht schaltbar")
+
+
+@callback
+def _async_resolve_targets(hass: HomeAssistant, hubs: dict, data: dict) -> list:
+    """Löst Entitäten und Keys zu ``[Ergebnis, ...]`` mit Entry-ID und Key auf.
+
+    Entitäten werden über die Entity-Registry und ihre Unique-ID dem Key
+    zugeordnet, Keys über den Datensatz-Index der Hubs (ohne ``entry_id`` in
+    allen PowerDogs, die den Key kennen). Nicht auflösbare Ziele erhalten
+    gleich einen Fehler.
+    """
+    targets = []
+    registry = er.async_get(hass)
+    for entity_id in data.get(ATTR_ENTITY_ID, ()):
+        entity = registry.async_get(entity_id)
+        key = (
+            key_from_unique_id(entity.domain, entity.config_entry_id, entity.unique_id)
+            if entity and entity.platform == DOMAIN else None
+        )
+        if key is None or entity.config_entry_id not in hubs:
+            targets.append({"target": entity_id, "success": False, "error": "Keine PowerDog Entität"})
+            continue
+        if key not in hubs[entity.config_entry_id]["hub"].values:
+            # z.B. Diagnose-Sensoren: Unique-ID passt zum Format, ist aber kein Geräte-Key
+            targets.append({"target": entity_id, "success": False, "error": "Unbekannter Key"})
+            continue
+        targets.append({"target": entity_id, "entry_id": entity.config_entry_id, "key": key})
+
+    entry_ids = data.get(ATTR_ENTRY_ID) or list(hubs)
+    for key in data.get(ATTR_KEY, ()):
+        found = [entry_id for entry_id in entry_ids if entry_id in hubs and key in hubs[entry_id]["hub"].values]
+        if not found:
+            targets.append({"target": key, "success": False, "error": "Unbekannter Key"})
+        for entry_id in found:
+            targets.append({"target": key, "entry_id": entry_id, "key": key})
+    return targets
+
+
+async def async_set_regulations(hass: HomeAssistant, data: dict) -> list:
+    """Setzt Modus bzw. Sollwert für alle Ziele und liefert das Ergebnis je Ziel.
+
+    Die Befehle laufen gleichzeitig über die Command-Queue der Hubs; was
+    dort innerhalb des Sammelfensters eintrifft, geht je PowerDog in einem
+    Multicall raus. Erfolgreiche Keys werden anschließend gezielt
+    zurückgelesen und ihre Entitäten aktualisiert.
+    """
+    hubs = _loaded_hubs(hass)
+    mode, value = data.get(ATTR_MODE), data.get(ATTR_VALUE)
+    results = _async_resolve_targets(hass, hubs, data)
+
+    pending = []
+    commands = {}  # (Entry-ID, Key) → Task; doppelte Ziele teilen sich einen Befehl
+    for result in results:
+        if "error" in result:
+            continue
+        hub = hubs[result["entry_id"]]["hub"]
+        try:
+            parameters = _regulation_parameters(hub.values[result["key"]], mode, value)
+        except ValueError as e:
+            result.update(success=False, error=str(e))
+            continue
+        command = (result["entry_id"], result["key"])
+        if command not in commands:
+            commands[command] = hass.async_create_task(
+                hub.async_set_regulation_parameters(result["key"], parameters)
+            )
+        pending.append((result, commands[command]))
+
+    if commands:
+        await asyncio.wait(commands.values())
+
+    confirmed = {}  # Entry-ID → erfolgreich gesetzte Keys
+    for result, task in pending:
+        result["success"] = task.result()
+        if result["success"]:
+            confirmed.setdefault(result["entry_id"], set()).add(result["key"])
+        else:
+            result["error"] = "Gerät hat den Befehl nicht angenommen"
+
+    for entry_id, keys in confirmed.items():
+        hass.async_create_task(_async_read_back(hubs[entry_id], keys))
+
+    _LOGGER.debug(
+        f"🎛️ PowerDog Regelung: {sum(map(len, confirmed.values()))} Key(s) gesetzt, {len(results)} Ziel(e) angefragt"
+    )
+    return results
+
+
+async def _async_read_back(data: dict, keys: set):
+    """Liest gesetzte Keys gemeinsam zurück und aktualisiert ihre Entitäten."""
+    hub, coordinator = data["hub"], data["coordinator"]
+    records = await asyncio.gather(*(hub.async_read_back(key) for key in keys))
+    coordinator.async_update_key_listeners(
+        [key for key, record in zip(keys, records) if record is not None]
+    )
+
+
+@callback
+def async_setup_services(hass: HomeAssistant):
+    """Registriert die Services der Integration (einmalig)."""
+    if hass.services.has_service(DOMAIN, SERVICE_GET_SNAPSHOT):
+        return
+
+    async def handle_set_regulation(call: ServiceCall) -> dict:
+        """Setzt Modus oder Sollwert vieler Regelungen auf einmal."""
+        return {"results": await async_set_regulations(hass, call.data)}
+
+    async def handle_set_auto_mode(call: ServiceCall):
+        """Schaltet Regelungen in den Auto-Modus (Kurzform von ``set_regulation``)."""
+        for result in await async_set_regulations(
+            hass, {ATTR_ENTITY_ID: call.data[ATTR_ENTITY_ID], ATTR_MODE: MODE_AUTO}
+        ):
+            if not result["success"]:
+                _LOGGER.error(f"❌ Fehler beim Setzen auf Auto-Modus für {result['target']}: {result['error']}")
+
+    async def handle_get_snapshot(call: ServiceCall) -> dict:
+        """Liefert die aktuellen Werte aller (bzw. der gewählten) PowerDogs in einer Antwort."""
+        entry_ids = call.data.get(ATTR_ENTRY_ID)
+        platforms = call.data.get(ATTR_TYPE)
+        pattern = _key_pattern(call.data.get(ATTR_KEY))
+        compact = call.data[ATTR_COMPACT]
+
+        hubs = {
+            entry_id: data["hub"].snapshot_values(platforms, pattern, compact)
+            for entry_id, data in _loaded_hubs(hass).items()
+            if not entry_ids or entry_id in entry_ids
+        }
+
+        _LOGGER.debug(f"📸 PowerDog Snapshot für {len(hubs)} Hub(s) geliefert")
+        return {"hubs": hubs}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_SNAPSHOT,
+        handle_get_snapshot,
+        schema=GET_SNAPSHOT_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_REGULATION,
+        handle_set_regulation,
+        schema=SET_REGULATION_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(DOMAIN, SERVICE_SET_AUTO_MODE, handle_set_auto_mode, schema=SET_AUTO_MODE_SCHEMA)
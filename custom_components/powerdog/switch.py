@@ -1,108 +1,93 @@
 import logging
-import asyncio
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.core import callback
+from .entity import PowerDogEntity, async_setup_key_entities, device_info, unique_id_for
 from . import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
-    hub = hass.data[DOMAIN]["hub"]
-    entities = [PowerDogSwitch(hub, entry, entity_id, entity) for entity_id, entity in hub.switches.items()]
-
-    async_add_entities(entities, True)
-
-    # **Neuen Service für den Auto-Modus registrieren**
-    async def handle_set_auto_mode(call):
-        entity_id = call.data.get("entity_id")
-        for switch in entities:
-            if switch.entity_id == entity_id:
-                switch.set_auto_mode()
-
-    hass.services.async_register(DOMAIN, "set_auto_mode", handle_set_auto_mode)
-
-class PowerDogSwitch(SwitchEntity):
-    def __init__(self, hub, entry, entity_id, entity_info):
+    data = hass.data[DOMAIN][entry.entry_id]
+    hub = data["hub"]
+    coordinator = data["coordinator"]
+    async_setup_key_entities(
+        hass,
+        entry,
+        "switch",
+        lambda entity_id, record: PowerDogSwitch(coordinator, hub, entry, entity_id, record),
+        async_add_entities,
+    )
+
+class PowerDogSwitch(PowerDogEntity, SwitchEntity):
+    def __init__(self, coordinator, hub, entry, entity_id, record):
+        super().__init__(coordinator, context=entity_id)
         self._hub = hub
         self._entry = entry
         self._entity_id = entity_id
-        self._name = f"{entity_info.get('Name', entity_id)}"
-        self._attr_unique_id = f"powerdog_{self._entity_id}"
+        self._name = f"{record.name or entity_id}"
+        self._attr_unique_id = unique_id_for("switch", entry.entry_id, entity_id)
         # Wert setzen
-        self._value = float(entity_info.get("Current_Value", 0))
+        self._value = float(record.value or 0)
 
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, str(entry.entry_id))},  # Nutze `entry_id`
-            name="PowerDog",
-            manufacturer="PowerDog",
-            model="API"
-        )
+        self._attr_device_info = device_info(entry, hub)
 
         # **Erkennen, ob es ein OnOff- oder Manual-Switch ist**
-        self._is_onoff_switch = "onoff(bool)" in entity_info.get("Setable", "").lower()
+        self._is_onoff_switch = "onoff(bool)" in (record.setable or "").lower()
 
         # **Status lesen**
-        switch_mode = entity_info.get("SwitchMode")  # Auto (0) oder Manuell (1)
-        switch_state = entity_info.get("SwitchState")  # 0 = AUS, 100 = AN
-        on_off = entity_info.get("OnOff")
+        self._state = self._state_from_record(record)
 
-        if self._is_onoff_switch:
-            self._state = bool(int(on_off)) if on_off is not None else False
-        else:
-            # Falls es ein Manual/Auto-Switch ist
-            if switch_mode == "1":
-                self._state = switch_state == "100"
-            else:
-                self._state = False  # Auto-Modus → wird als AUS angezeigt
+    def _state_from_record(self, record) -> bool:
+        """Leitet den Schaltzustand aus Modus und Status des Geräts ab."""
+        switch_mode = record.switch_mode  # Auto (0) oder Manuell (1)
+        switch_state = record.switch_state  # 0 = AUS, 100 = AN
+        on_off = record.on_off
 
-    def turn_on(self, **kwargs):
-        """Schalte den Switch an."""
+        if self._is_onoff_switch:
+            return bool(int(on_off)) if on_off is not None else False
+
+        # Falls es ein Manual/Auto-Switch ist
+        if switch_mode == "1":
+            return switch_state == "100"
+        return False  # Auto-Modus → wird als AUS angezeigt
+
+    def _restore_from_record(self, record) -> bool:
+        """Übernimmt den zurückgelesenen Schaltzustand."""
+        state = self._state_from_record(record)
+        if state == self._state:
+            return False
+        self._state = state
+        return True
+
+    async def _async_switch(self, on: bool) -> bool:
+        """Schaltet den Switch über die API; gibt True bei Erfolg zurück."""
+        if self._is_onoff_switch:
+            return await self._hub.async_set_regulation_parameter(
+                self._entity_id, "onoff", "1" if on else "0"
+            )
 
-        try:
-            if self._is_onoff_switch:
-                response = self._hub.client.setRegulationParameter(
-                    self._hub.password, self._entity_id, "onoff", "1"
-                )
-            else:
-                # Manual/Auto-Switch zuerst auf manuellen Modus setzen, dann aktivieren
-                self._hub.client.setRegulationParameter(
-                    self._hub.password, self._entity_id, "manual", "1"
-                )
-                response = self._hub.client.setRegulationParameter(
-                    self._hub.password, self._entity_id, "value", "100"
-                )
+        # Manual/Auto-Switch zuerst auf manuellen Modus setzen, dann schalten
+        return await self._hub.async_set_regulation_parameters(
+            self._entity_id, [("manual", "1"), ("value", "100" if on else "0")]
+        )
 
+    async def async_turn_on(self, **kwargs):
+        """Schalte den Switch an."""
+        if await self._async_switch(True):
             self._state = True
-        except Exception as e:
-            _LOGGER.error(f"❌ Fehler beim Einschalten von {self._name}: {e}")
-
-    def turn_off(self, **kwargs):
-        try:
-            if self._is_onoff_switch:
-                response = self._hub.client.setRegulationParameter(
-                    self._hub.password, self._entity_id, "onoff", "0"
-                )
-            else:
-                # Manual/Auto-Switch zuerst auf manuellen Modus setzen, dann deaktivieren
-                self._hub.client.setRegulationParameter(
-                    self._hub.password, self._entity_id, "manual", "1"
-                )
-                response = self._hub.client.setRegulationParameter(
-                    self._hub.password, self._entity_id, "value", "0"
-                )
+            self.async_write_ha_state()
+            self._async_schedule_confirm()
+        else:
+            _LOGGER.error(f"❌ Fehler beim Einschalten von {self._name}")
 
+    async def async_turn_off(self, **kwargs):
+        """Schalte den Switch aus."""
+        if await self._async_switch(False):
             self._state = False
-        except Exception as e:
-            _LOGGER.error(f"❌ Fehler beim Ausschalten von {self._name}: {e}")
-
-    def set_auto_mode(self):
-        try:
-            response = self._hub.client.setRegulationParameter(
-                self._hub.password, self._entity_id, "manual", "0"
-            )
-            self._state = False  # Auto-Modus → wird als AUS angezeigt
-        except Exception as e:
-            _LOGGER.error(f"❌ Fehler beim Setzen auf Auto-Modus für {self._name}: {e}")
+            self.async_write_ha_state()
+            self._async_schedule_confirm()
+        else:
+            _LOGGER.error(f"❌ Fehler beim Ausschalten von {self._name}")
 
     @property
     def is_on(self):
@@ -114,24 +99,16 @@ class PowerDogSwitch(SwitchEntity):
         """Gibt den Namen des Switches zurück."""
         return self._name
 
-    @property
-    def unique_id(self):
-        """Gibt eine eindeutige ID für die Entität zurück."""
-        return f"powerdog_switch_{self._entity_id}"
-
-    async def async_update(self):
-        """Aktualisiert den Wert aus dem Hub."""
+    @callback
+    def _handle_coordinator_update(self):
+        """Übernimmt den neuen Wert aus dem Hub, sobald der Coordinator aktualisiert hat."""
         if self._entity_id not in self._hub.switches:
             _LOGGER.warning(f"⚠️ Entität {self._entity_id} existiert nicht mehr im Hub-Datenbestand!")
             return
 
-        value = self._hub.switches.get(self._entity_id, {}).get("Current_Value")
+        value = self._hub.switches[self._entity_id].value
         if value is not None:
             self._state = bool(int(value))  # ✅ Status korrekt setzen
 
-        # ✅ Erst updaten, wenn die Entität wirklich registriert wurde
-        if self.registry_entry:
-            self.async_write_ha_state()
-            _LOGGER.debug(f"🔄 {self._name} aktualisiert auf {self._state}")
-        else:
-            _LOGGER.warning(f"⚠️ HA hat {self._name} noch nicht registriert!")
\ No newline at end of file
+        self.async_write_ha_state()
+        _LOGGER.debug(f"🔄 {self._name} aktualisiert auf {self._state}")
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""Poll-Stufen für PowerDog Werte: schnelle Spur und selten verarbeitete langsame Spur."""
+import fnmatch
+import re
+
+from .const import CONF_SLOW_POLL_INTERVAL, CONF_SLOW_POLL_KEYS, DEFAULT_SLOW_POLL_KEYS
+
+
+def parse_slow_keys(text: str) -> tuple[frozenset, re.Pattern | None]:
+    """Liest die Auswahl der langsamen Spur aus einem Text wie ``"counter, usage, temp_*"``.
+
+    Jeder Eintrag ist ein LinearType (z.B. ``counter``, ``usage``) oder ein
+    Key-Muster mit ``*``/``?``. Liefert ``(LinearTypes, Regex über Keys)``.
+    """
+    types, patterns = set(), []
+    for part in (text or "").replace("\n", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if any(char in part for char in "*?["):
+            patterns.append(fnmatch.translate(part))
+        else:
+            types.add(part)
+            patterns.append(re.escape(part) + r"\Z")  # Ein Name ohne Wildcard gilt auch als Key
+    return frozenset(types), re.compile("|".join(patterns)) if patterns else None
+
+
+class PollTiers:
+    """Ordnet Datensätze der schnellen oder der langsamen Spur zu.
+
+    Die schnelle Spur wird bei jedem Poll verarbeitet, die langsame nur
+    alle ``slow_interval`` Sekunden; dazwischen überspringt der Parser
+    ihre Werte. ``slow_interval`` 0 schaltet die Stufen ab.
+    """
+
+    def __init__(self, slow_interval: float = 0, slow_keys: str = ""):
+        """Initialisiere die Stufen."""
+        self.slow_interval = slow_interval
+        self.slow_keys = slow_keys
+        self._types, self._pattern = parse_slow_keys(slow_keys)
+
+    @classmethod
+    def from_options(cls, options) -> "PollTiers":
+        """Erstellt die Stufen aus den Optionen des Config-Entries."""
+        return cls(
+            float(options.get(CONF_SLOW_POLL_INTERVAL, 0) or 0),
+            options.get(CONF_SLOW_POLL_KEYS, DEFAULT_SLOW_POLL_KEYS),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """True, wenn es eine langsame Spur gibt."""
+        return self.slow_interval > 0 and (bool(self._types) or self._pattern is not None)
+
+    def is_slow(self, record) -> bool:
+        """True, wenn der Datensatz zur langsamen Spur gehört."""
+        return record.linear_type in self._types or (
+            self._pattern is not None and self._pattern.match(record.key) is not None
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, PollTiers)
+            and (self.slow_interval, self.slow_keys) == (other.slow_interval, other.slow_keys)
+        )